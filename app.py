@@ -1,57 +1,89 @@
 import streamlit as st
-from visualization import DataProvider, StatsCalculator, DataVisualizer
+from typing import Any, Dict, List
+from visualization import DataProvider, StatsCalculator, StatsFilter, DataVisualizer
 from ui.components.game_form import render_game_form
 from ui.components.history_view import render_game_history
+from ui.components.metrics_panel import render_metrics_toggle, render_metrics_panel, metrics_fragment
+from ui.data_loader import load_dashboard_data
 from data.repositories import PlayerRepository
 from core.enums import Edition, GameFormat
 
+# Session key of the message shown after the rerun that follows a new player
+PLAYER_FLASH_KEY = "add_player_flash"
+
 st.title("Magic The Gathering Game Logger")
 
+# Start recording query metrics before any data is loaded
+render_metrics_toggle()
+
 # Initialize visualization components
 data_provider = DataProvider()
 stats_calculator = StatsCalculator(data_provider)
 visualizer = DataVisualizer(stats_calculator)
 
-# Render game form
-render_game_form()
-
-# Render game history with its own filters
-render_game_history()
-
-# Player statistics section
-st.header("Player Statistics")
-
-# Overall win rates (show all games as default)
-st.subheader("Overall Win Rates")
-overall_start_date = st.date_input(
-                "From Date",
-                value=None,
-                key="overall_start_date",
-                help="Start date for player statistics (inclusive)"
-            )
-overall_end_date = st.date_input(
-                "To Date",
-                value=None,
-                key="overall_end_date",
-                help="End date for player statistics (inclusive)"
-            )
-overall_edition_filter = st.selectbox(
-                "Edition",
-                ["All"] + Edition.list()[1:],
-                key="overall_edition_filter"
-            )
-overall_format_filter = st.selectbox(
-                "Format",
-                ["All"] + GameFormat.list(),  # Include all formats
-                key="overall_format_filter"
-            )
-visualizer.plot_player_win_rates(start_date=overall_start_date, end_date=overall_end_date, edition_filter=overall_edition_filter, format_filter=overall_format_filter)
-
-# Player details with separate filters
-players = PlayerRepository.get_all()
-player_names = sorted([p["name"] for p in players])  # Sort player names alphabetically
+# Load the data of all sections concurrently before rendering
+dashboard_data = load_dashboard_data(data_provider)
+
+# Each section below is a fragment: its widgets only rerun that section, which then shows its own query metrics
+
+@metrics_fragment
+def render_overall_win_rates() -> None:
+    # Overall win rates (show all games as default)
+    st.subheader("Overall Win Rates")
+    overall_start_date = st.date_input(
+                    "From Date",
+                    value=None,
+                    key="overall_start_date",
+                    help="Start date for player statistics (inclusive)"
+                )
+    overall_end_date = st.date_input(
+                    "To Date",
+                    value=None,
+                    key="overall_end_date",
+                    help="End date for player statistics (inclusive)"
+                )
+    overall_edition_filter = st.selectbox(
+                    "Edition",
+                    ["All"] + Edition.list()[1:],
+                    key="overall_edition_filter"
+                )
+    overall_format_filter = st.selectbox(
+                    "Format",
+                    ["All"] + GameFormat.list(),  # Include all formats
+                    key="overall_format_filter"
+                )
+    visualizer.plot_player_win_rates(start_date=overall_start_date, end_date=overall_end_date, edition_filter=overall_edition_filter, format_filter=overall_format_filter)
+
+    st.subheader("Head-to-Head")
+    visualizer.plot_head_to_head(start_date=overall_start_date, end_date=overall_end_date, edition_filter=overall_edition_filter, format_filter=overall_format_filter)
+
+@metrics_fragment
+def render_ratings() -> None:
+    # Elo ratings over the whole history, weighting each result by the opponent's strength
+    st.subheader("Ratings")
+    rating_col1, rating_col2 = st.columns(2)
+    with rating_col1:
+        rating_edition_filter = st.selectbox(
+                        "Edition",
+                        ["All"] + Edition.list()[1:],
+                        key="rating_edition_filter"
+                    )
+    with rating_col2:
+        rating_format_filter = st.selectbox(
+                        "Format",
+                        ["All"] + GameFormat.list(),
+                        key="rating_format_filter"
+                    )
+    visualizer.plot_player_ratings(edition_filter=rating_edition_filter, format_filter=rating_format_filter)
+
+@metrics_fragment
+def render_player_details(players: List[Dict[str, Any]]) -> None:
+    # Player details with separate filters
+    player_names = sorted([p["name"] for p in players])  # Sort player names alphabetically
+
+    if not player_names:
+        return
 
-if player_names:
     st.subheader("Player Details")
 
     # Player selection and filters in two rows
@@ -98,40 +130,56 @@ if player_names:
                 key="stats_format"
             )
 
-    # Show filtered player statistics
+    # Show filtered player statistics, all computed in one pass
     if selected_player:
-        visualizer.plot_player_matchups(
-            selected_player,
+        stats_filter = StatsFilter(
             start_date=stats_start_date,
             end_date=stats_end_date,
             edition_filter=stats_edition,
             format_filter=stats_format
         )
+        player_stats = stats_calculator.calculate_player_stats(selected_player, stats_filter)
+
+        visualizer.plot_player_matchups(selected_player, player_stats=player_stats)
+        visualizer.plot_player_win_rates_by_color(selected_player, player_stats=player_stats)
+        visualizer.plot_player_individual_color_stats(selected_player, player_stats=player_stats)
+        visualizer.plot_player_trend(selected_player, stats_filter)
+
+@metrics_fragment
+def render_add_player() -> None:
+    # Add new player
+    st.header("Add new player")
+    flash = st.session_state.pop(PLAYER_FLASH_KEY, None)
+    if flash:
+        st.success(flash)
+
+    new_player_name = st.text_input("Player name")
+    if st.button("Add Player"):
+        try:
+            PlayerRepository.add(new_player_name)
+        except ValueError as ve:
+            st.error(str(ve))
+            return
+        except Exception as e:
+            st.error(f"Failed to add player: {e}")
+            return
+        # Every section lists the players, so refresh the whole app
+        st.session_state[PLAYER_FLASH_KEY] = f"Player {new_player_name} added successfully!"
+        st.rerun()
 
-        visualizer.plot_player_win_rates_by_color(
-            selected_player,
-            start_date=stats_start_date,
-            end_date=stats_end_date,
-            edition_filter=stats_edition,
-            format_filter=stats_format
-        )
+# Render game form
+render_game_form()
 
-        visualizer.plot_player_individual_color_stats(
-            selected_player,
-            start_date=stats_start_date,
-            end_date=stats_end_date,
-            edition_filter=stats_edition,
-            format_filter=stats_format
-        )
+# Render game history with its own filters
+render_game_history(prefetched=dashboard_data.history)
+
+# Player statistics section
+st.header("Player Statistics")
+render_overall_win_rates()
+render_ratings()
+render_player_details(dashboard_data.players)
+
+render_add_player()
 
-# Add new player
-st.header("Add new player")
-new_player_name = st.text_input("Player name")
-if st.button("Add Player"):
-    try:
-        PlayerRepository.add(new_player_name)
-        st.success(f"Player {new_player_name} added successfully!")
-    except ValueError as ve:
-        st.error(str(ve))
-    except Exception as e:
-        st.error(f"Failed to add player: {e}")
+# Show the query metrics of this rerun once every section has loaded its data
+render_metrics_panel()
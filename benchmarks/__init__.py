@@ -0,0 +1,4 @@
+"""Benchmark suite with a deterministic synthetic game generator
+
+Usage: python -m benchmarks.run [--sizes 1000 100000 1000000] [--output FILE] [--baseline FILE]
+"""
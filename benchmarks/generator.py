@@ -0,0 +1,110 @@
+"""Deterministic generator of realistic players and games"""
+import json
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+from core.enums import GameFormat, Color, Edition
+from data.backends.sqlite import SCHEMA
+
+# Relative frequency of each format in a typical playgroup
+FORMAT_WEIGHTS = {
+    GameFormat.DRAFT: 30,
+    GameFormat.SEALED: 10,
+    GameFormat.CONSTRUCTED: 15,
+    GameFormat.COMMANDER: 25,
+    GameFormat.WINSTON_DRAFT: 8,
+    GameFormat.JUMP_IN: 7,
+    GameFormat.BOOSTER_WAR: 5,
+}
+# Formats played with a specific set
+LIMITED_FORMATS = {GameFormat.DRAFT, GameFormat.SEALED, GameFormat.WINSTON_DRAFT, GameFormat.JUMP_IN, GameFormat.BOOSTER_WAR}
+
+START = datetime(2022, 1, 1, 18, 0)
+GAMES_PER_DAY = 40
+
+
+def default_player_count(game_count: int) -> int:
+    """Playgroup size growing slowly with the number of games"""
+    return max(8, min(200, int(game_count ** 0.5 / 5)))
+
+
+def generate_players(count: int) -> List[Dict[str, Any]]:
+    return [{"id": player_id, "name": f"Player {player_id:03d}"} for player_id in range(1, count + 1)]
+
+
+def generate_games(count: int, players: List[Dict[str, Any]], seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yield game rows as stored in the database
+
+    Players differ in skill, activity and favorite colors; editions follow
+    each other over time. The same seed always yields the same games.
+    """
+    rng = random.Random(seed)
+    player_ids = [player["id"] for player in players]
+    skill = {player_id: rng.gauss(0, 1) for player_id in player_ids}
+    # Few regulars play most games
+    activity = [1 / rank for rank in range(1, len(player_ids) + 1)]
+    favorites = {player_id: rng.sample(list(Color), 2) for player_id in player_ids}
+    formats = list(FORMAT_WEIGHTS)
+    format_weights = list(FORMAT_WEIGHTS.values())
+    editions = [edition.value for edition in Edition if edition != Edition.NONE]
+
+    def deck(player_id: int) -> List[str]:
+        size = rng.choices([0, 1, 2, 3], weights=[2, 25, 60, 13])[0]
+        colors = favorites[player_id][:size]
+        while len(colors) < size:
+            color = rng.choice(list(Color))
+            if color not in colors:
+                colors.append(color)
+        return [color.value for color in colors]
+
+    for game_id in range(1, count + 1):
+        first, second = rng.choices(player_ids, weights=activity, k=1)[0], rng.choice(player_ids)
+        while second == first:
+            second = rng.choice(player_ids)
+        # Logistic win probability from the skill difference
+        first_wins = rng.random() < 1 / (1 + 10 ** ((skill[second] - skill[first]) / 2))
+        winner, loser = (first, second) if first_wins else (second, first)
+
+        game_format = rng.choices(formats, weights=format_weights)[0]
+        day = game_id // GAMES_PER_DAY
+        edition = None
+        if game_format in LIMITED_FORMATS:
+            # The set of the month, sometimes an older one
+            edition = editions[(day // 30 + (rng.random() < 0.2)) % len(editions)]
+        played_at = START + timedelta(days=day, minutes=rng.randrange(0, 6 * 60))
+
+        yield {
+            "id": game_id,
+            "winner_id": winner,
+            "loser_id": loser,
+            "format": game_format.value,
+            "edition": edition,
+            "winner_colors": deck(winner),
+            "loser_colors": deck(loser),
+            "played_at": played_at.isoformat(),
+        }
+
+
+def seed_database(path: str, game_count: int, player_count: int, seed: int = 0) -> None:
+    """Create a SQLite database with generated players and games"""
+    players = generate_players(player_count)
+    connection = sqlite3.connect(path)
+    try:
+        connection.executescript(SCHEMA)
+        with connection:
+            connection.executemany("INSERT INTO players (id, name) VALUES (:id, :name)", players)
+            connection.executemany(
+                "INSERT INTO games (id, winner_id, loser_id, format, edition, winner_colors, loser_colors, played_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        game["id"], game["winner_id"], game["loser_id"], game["format"], game["edition"],
+                        json.dumps(game["winner_colors"]), json.dumps(game["loser_colors"]), game["played_at"],
+                    )
+                    for game in generate_games(game_count, players, seed)
+                ),
+            )
+    finally:
+        connection.close()
+
@@ -0,0 +1,101 @@
+"""Report the startup cost of the app
+
+Usage: python -m benchmarks.import_time [--top 20] [--repeat 3]
+
+Imports every module app.py imports in a fresh interpreter with -X importtime
+and lists the most expensive modules and packages. It then times the first
+run of app.py in another fresh process. That process uses the in-memory
+backend unless DB_BACKEND is set, so no network time is included.
+"""
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+APP = ROOT / "app.py"
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+FIRST_RENDER = """
+import time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({app!r}, default_timeout=600)
+app.run()
+if app.exception:
+    raise SystemExit(app.exception[0].value)
+print(time.perf_counter() - started)
+"""
+
+
+def app_imports(path: Path = APP) -> List[str]:
+    """Modules imported at the top level of the app script"""
+    modules = []
+    for node in ast.parse(path.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def import_times(modules: List[str]) -> List[Tuple[str, int, int]]:
+    """(module, self microseconds, cumulative microseconds) of a fresh import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            times.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return times
+
+
+def first_render_seconds(env: Dict[str, str]) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_RENDER.format(app=str(APP))],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report import and first render times of the app")
+    parser.add_argument("--top", type=int, default=20, help="number of modules and packages to list")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per measurement, the best one counts")
+    args = parser.parse_args()
+
+    modules = app_imports()
+    runs = [import_times(modules) for _ in range(args.repeat)]
+    times = min(runs, key=lambda run: sum(self_time for _, self_time, _ in run))
+    total = sum(self_time for _, self_time, _ in times)
+
+    packages: Dict[str, int] = defaultdict(int)
+    for module, self_time, _ in times:
+        packages[module.split(".")[0]] += self_time
+
+    print(f"Importing {', '.join(modules)}: {total / 1000:.0f} ms\n")
+    print(f"{'package':<40} {'ms':>8} {'share':>7}")
+    for package, self_time in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{package:<40} {self_time / 1000:>8.1f} {self_time / total:>7.1%}")
+
+    print(f"\n{'module':<60} {'self ms':>8} {'cumulative ms':>14}")
+    for module, self_time, cumulative in sorted(times, key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{module:<60} {self_time / 1000:>8.1f} {cumulative / 1000:>14.1f}")
+
+    env = dict(os.environ)
+    env.setdefault("DB_BACKEND", "memory")
+    render = min(first_render_seconds(env) for _ in range(args.repeat))
+    print(f"\nFirst run of app.py in a fresh process ({env['DB_BACKEND']} backend): {render * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""Run the benchmark suite and compare the results against a baseline
+
+Every size runs in its own process against a freshly seeded SQLite
+database, or the in-memory backend with a simulated latency per request, so
+the process-wide caches and the memory peak of one size do not leak into
+the next.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from .generator import START, GAMES_PER_DAY, default_player_count, generate_games, generate_players, seed_database
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+# Slowdown relative to the baseline that is reported as a regression
+REGRESSION_THRESHOLD = 0.2
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def measure(fn: Callable[[], Any], game_count: int, repeat: int) -> Dict[str, float]:
+    """Best wall time of several runs, plus the allocation peak of one traced run"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    # Tracing slows everything down, so it is kept out of the timed runs
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    seconds = min(timings)
+    return {
+        "seconds": round(seconds, 6),
+        "games_per_second": round(game_count / seconds, 1) if seconds else None,
+        "peak_mib": round(peak / 2 ** 20, 3),
+    }
+
+
+def _benchmarks(game_count: int, dashboard: bool) -> Dict[str, Callable[[], Any]]:
+    """Benchmarked calls; imported here so that the database settings apply"""
+    from core.models import Game
+    from data.aggregates import game_aggregates
+    from data.repositories import GameRepository
+    from visualization import DataProvider, StatsCalculator, StatsFilter
+    from visualization.cube import AggregateCube
+    from visualization.game_table import GameTable
+    from visualization.ratings import rating_engine
+
+    class PreloadedDataProvider(DataProvider):
+        """Serves one prebuilt table, isolating the statistics from loading"""
+        def __init__(self, table: GameTable):
+            self.table = table
+
+        def get_game_table(self) -> GameTable:
+            return self.table
+
+    def build_table() -> GameTable:
+        return GameTable.from_pages(GameRepository.iter_pages())
+
+    def load_aggregates() -> None:
+        game_aggregates.refresh()
+        game_aggregates.player_records()
+
+    first_page = next(GameRepository.iter_pages(), [])
+    calculator = StatsCalculator(PreloadedDataProvider(build_table()))
+    load_aggregates()
+
+    # The most active player and the last 90 days of the generated history
+    player = "Player 001"
+    last_day = (START + timedelta(days=game_count // GAMES_PER_DAY)).date()
+    filters = {
+        "all": StatsFilter(),
+        "90_days": StatsFilter(start_date=last_day - timedelta(days=90), end_date=last_day),
+    }
+
+    benchmarks: Dict[str, Callable[[], Any]] = {
+        "game_table.build": build_table,
+        "aggregates.load": load_aggregates,
+        "aggregate_cube.build": lambda: AggregateCube(calculator.data_provider.get_game_table()),
+        "models.from_rows[page]": lambda: Game.from_rows(first_page),
+    }
+    for label, stats_filter in filters.items():
+        dates = dict(start_date=stats_filter.start_date, end_date=stats_filter.end_date)
+        benchmarks.update({
+            f"stats.player_stats[{label}]": lambda f=stats_filter: calculator.calculate_player_stats(player, f),
+            f"stats.win_rates[{label}]": lambda d=dates: calculator.calculate_player_win_rates(**d),
+            f"stats.matchups[{label}]": lambda d=dates: calculator.calculate_player_matchups(player, **d),
+            f"stats.head_to_head[{label}]": lambda d=dates: calculator.calculate_head_to_head(**d),
+            f"stats.trend[{label}]": lambda f=stats_filter: calculator.calculate_player_trend(player, f),
+            f"stats.color_stats[{label}]": lambda d=dates: calculator.calculate_player_color_stats(player, **d),
+            f"stats.individual_color_stats[{label}]": (
+                lambda d=dates: calculator.calculate_player_individual_color_stats(player, **d)
+            ),
+        })
+    def replay_ratings() -> None:
+        rating_engine.reset()
+        calculator.calculate_player_ratings()
+
+    benchmarks.update({
+        # A full replay of the history versus a rerun on the same data version
+        "ratings.replay": replay_ratings,
+        "ratings.rerun": calculator.calculate_player_ratings,
+    })
+    benchmarks.update({
+        "repository.filtered_games[player]": lambda: GameRepository.get_filtered_games(player_id=1, limit=100),
+        "repository.filtered_games[90_days]": lambda: GameRepository.get_filtered_games(
+            start_date=filters["90_days"].start_date, end_date=filters["90_days"].end_date,
+            format_filter="Draft", limit=100
+        ),
+    })
+
+    if dashboard:
+        import streamlit as st
+        from streamlit.testing.v1 import AppTest
+        from data.player_directory import player_directory
+
+        def rerun(app: AppTest) -> None:
+            app.run()
+            if app.exception:
+                raise RuntimeError(app.exception[0].value)
+
+        def first_run() -> None:
+            # Start from empty caches, like the first visitor after a deploy
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            player_directory.refresh()
+            game_aggregates.refresh()
+            rating_engine.reset()
+            rerun(AppTest.from_file(str(ROOT / "app.py"), default_timeout=600))
+
+        # A rerun of the same session hits the warm caches
+        warm_app = AppTest.from_file(str(ROOT / "app.py"), default_timeout=600)
+        benchmarks["dashboard.first_run"] = first_run
+        benchmarks["dashboard.rerun"] = lambda: rerun(warm_app)
+    return benchmarks
+
+
+def run_worker(game_count: int, player_count: int, seed: int, repeat: int, dashboard: bool, output: str) -> None:
+    from config.config import config
+    from data.backends.memory import MemoryClient
+
+    if isinstance(config.db, MemoryClient):
+        players = generate_players(player_count)
+        config.db.load("players", players)
+        config.db.load("games", list(generate_games(game_count, players, seed)))
+
+    results = {
+        name: measure(fn, game_count, repeat)
+        for name, fn in _benchmarks(game_count, dashboard).items()
+    }
+    Path(output).write_text(json.dumps(results))
+
+
+def run_size(
+    game_count: int,
+    player_count: Optional[int],
+    seed: int,
+    repeat: int,
+    dashboard: bool,
+    backend: str = "sqlite",
+    latency_ms: float = 0
+) -> Dict[str, Any]:
+    """Seed a database of the given size and benchmark it in a separate process"""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "results.json")
+        players = player_count or default_player_count(game_count)
+
+        if backend == "sqlite":
+            database = os.path.join(directory, "benchmark.db")
+            started = time.perf_counter()
+            seed_database(database, game_count, players, seed)
+            print(f"Seeded {game_count} games of {players} players in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            env = dict(os.environ, DB_BACKEND="sqlite", SQLITE_PATH=database)
+        else:
+            # The worker seeds its own in-memory tables
+            env = dict(os.environ, DB_BACKEND="memory", MEMORY_LATENCY_MS=str(latency_ms))
+
+        command = [
+            sys.executable, "-m", "benchmarks.run", "--worker", str(game_count),
+            "--players", str(players), "--seed", str(seed), "--repeat", str(repeat), "--output", output,
+        ]
+        if not dashboard:
+            command.append("--no-dashboard")
+        subprocess.run(command, cwd=ROOT, env=env, check=True)
+        return {"players": players, "benchmarks": json.loads(Path(output).read_text())}
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """Print the change against the baseline and return the regressions"""
+    regressions = []
+    for size, current in results["sizes"].items():
+        previous = baseline.get("sizes", {}).get(size)
+        if not previous:
+            continue
+        for name, stats in current["benchmarks"].items():
+            before = previous["benchmarks"].get(name)
+            if not before or not before["seconds"]:
+                continue
+            ratio = stats["seconds"] / before["seconds"]
+            marker = ""
+            if ratio > 1 + threshold:
+                marker = "  REGRESSION"
+                regressions.append(f"{size} {name}")
+            print(f"{size:>9} {name:<45} {before['seconds']:>10.4f}s -> {stats['seconds']:>10.4f}s  x{ratio:.2f}{marker}")
+    return regressions
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    print(f"{'games':>9} {'benchmark':<45} {'seconds':>11} {'games/s':>14} {'peak MiB':>10}")
+    for size, current in results["sizes"].items():
+        for name, stats in current["benchmarks"].items():
+            print(
+                f"{size:>9} {name:<45} {stats['seconds']:>11.4f} "
+                f"{stats['games_per_second'] or 0:>14,.0f} {stats['peak_mib']:>10.2f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark statistics, repositories and the dashboard")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="numbers of games")
+    parser.add_argument("--players", type=int, help="number of players (default grows with the size)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the game generator")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark, the best one counts")
+    parser.add_argument("--backend", choices=["sqlite", "memory"], default="sqlite", help="storage to benchmark against")
+    parser.add_argument("--latency-ms", type=float, default=0, help="simulated latency per request of the memory backend")
+    parser.add_argument("--no-dashboard", action="store_true", help="skip the dashboard reruns")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against results written by an earlier run")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="slowdown reported as regression")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        run_worker(args.worker, args.players, args.seed, args.repeat, not args.no_dashboard, args.output)
+        return
+
+    results = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "backend": args.backend,
+        "latency_ms": args.latency_ms,
+        "sizes": {
+            str(size): run_size(
+                size, args.players, args.seed, args.repeat, not args.no_dashboard, args.backend, args.latency_ms
+            )
+            for size in args.sizes
+        },
+    }
+    print_results(results)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.baseline}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,21 @@
 import streamlit as st
-from supabase import create_client
 from typing import Optional
 import logging
-from dotenv import load_dotenv
 import os
+import threading
+from .metrics import MetricsRegistry
 
-# Load environment variables
-load_dotenv()
+# The supabase client stack and dotenv are imported on first use to keep startup fast
 
 class Config:
     """Central configuration class"""
     _instance: Optional['Config'] = None
     _db_client = None
     _logger = None
+    _metrics = None
+    _env_loaded = False
+    # Streamlit serves every session on its own thread; they share one client
+    _db_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
@@ -34,23 +37,71 @@ class Config:
             self._setup_logging()
         return self._logger
 
+    @property
+    def metrics(self) -> MetricsRegistry:
+        """Registry of per-call query metrics"""
+        if self._metrics is None:
+            # Instrumenting a function creates the registry at import time, so the setting is read on first call
+            self._metrics = MetricsRegistry(self.logger, log_all=self._metrics_log)
+        return self._metrics
+
+    def _metrics_log(self) -> bool:
+        # METRICS_LOG writes every call of every session to the log
+        return str(self.get_setting("METRICS_LOG", "")).lower() in ("1", "true", "yes")
+
+    def _load_env(self) -> None:
+        if not self._env_loaded:
+            from dotenv import load_dotenv
+
+            # Load environment variables
+            load_dotenv()
+            Config._env_loaded = True
+
+    def get_setting(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Read a setting from streamlit secrets, falling back to env vars"""
+        self._load_env()
+        value = st.secrets.get(name) if st.secrets.load_if_toml_exists() else None
+        return value if value is not None else os.getenv(name, default)
+
     @property
     def db(self):
         if self._db_client is None:
-            try:
+            with self._db_lock:
+                # Another session may have created the client while this one waited
+                if self._db_client is None:
+                    Config._db_client = self._create_db_client()
+        return self._db_client
+
+    def _create_db_client(self):
+        try:
+            # DB_BACKEND selects the storage: "supabase" (default), "sqlite" or "memory"
+            backend = self.get_setting("DB_BACKEND", "supabase").lower()
+            if backend == "sqlite":
+                from data.backends.sqlite import SQLiteClient
+                return SQLiteClient(self.get_setting("SQLITE_PATH", "mtg_logger.db"))
+            elif backend == "memory":
+                from data.backends.memory import MemoryClient
+                max_rows = self.get_setting("MEMORY_MAX_ROWS")
+                return MemoryClient(
+                    latency=float(self.get_setting("MEMORY_LATENCY_MS", "0")) / 1000,
+                    max_rows=int(max_rows) if max_rows else None
+                )
+            elif backend == "supabase":
                 # Try to get from streamlit secrets first, fall back to env vars
-                url = st.secrets.get("SUPABASE_URL", os.getenv("SUPABASE_URL"))
-                key = st.secrets.get("SUPABASE_KEY", os.getenv("SUPABASE_KEY"))
+                url = self.get_setting("SUPABASE_URL")
+                key = self.get_setting("SUPABASE_KEY")
 
                 if not url or not key:
                     raise ValueError("Supabase credentials not found in secrets or .env file")
 
-                self._db_client = create_client(url, key)
+                from data.backends.supabase import PoolSettings, create_pooled_client
+                return create_pooled_client(url, key, PoolSettings.from_settings())
+            else:
+                raise ValueError(f"Unknown DB_BACKEND: {backend}")
 
-            except Exception as e:
-                self.logger.error(f"Database connection failed: {str(e)}")
-                raise
-        return self._db_client
+        except Exception as e:
+            self.logger.error(f"Database connection failed: {str(e)}")
+            raise
 
 # Create the singleton instance
 config = Config()
@@ -0,0 +1,192 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Union
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Sessions whose last rerun is kept for the debug panel
+MAX_SESSIONS = 100
+
+
+@dataclass
+class CallMetric:
+    """Timing and size of one repository or data provider call"""
+    name: str
+    seconds: float
+    rows: Optional[int] = None
+    payload_bytes: Optional[int] = None
+    # "hit" or "miss" for cached calls, None otherwise
+    cache: Optional[str] = None
+    error: Optional[str] = None
+    thread: str = ""
+
+
+def _row_count(result: Any) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, (str, bytes)) or not hasattr(result, "__len__"):
+        # A single value such as a player name
+        return 1
+    return len(result)
+
+
+def _payload_bytes(result: Any) -> Optional[int]:
+    """Approximate size of a result: JSON length of rows, buffer size of arrays"""
+    if isinstance(result, (list, tuple, dict, str)):
+        return len(json.dumps(result, default=str))
+    if hasattr(result, "memory_usage"):
+        return int(result.memory_usage(deep=True).sum())
+    arrays = [value for value in vars(result).values() if hasattr(value, "nbytes")] if hasattr(result, "__dict__") else []
+    return sum(array.nbytes for array in arrays) if arrays else None
+
+
+class MetricsRegistry:
+    """Collects per-call metrics of the current rerun of each session
+
+    Recording is off unless a session enables it through the debug panel or
+    METRICS_LOG is set, so instrumented calls cost a single lookup otherwise.
+    """
+    def __init__(self, logger, log_all: Union[bool, Callable[[], bool]] = False):
+        self.logger = logger
+        # A callable is resolved on first use, not when functions are instrumented at import
+        self._log_all = log_all
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._enabled_sessions = set()
+        self._runs: 'OrderedDict[str, List[CallMetric]]' = OrderedDict()
+
+    @property
+    def log_all(self) -> bool:
+        if callable(self._log_all):
+            self._log_all = bool(self._log_all())
+        return self._log_all
+
+    @staticmethod
+    def _session_id() -> Optional[str]:
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+
+    def _active(self, session_id: Optional[str]) -> bool:
+        return self.log_all or session_id in self._enabled_sessions
+
+    def set_enabled(self, enabled: bool) -> None:
+        """Turn recording on or off for the current session"""
+        session_id = self._session_id()
+        with self._lock:
+            if enabled:
+                self._enabled_sessions.add(session_id)
+            else:
+                self._enabled_sessions.discard(session_id)
+                self._runs.pop(session_id, None)
+
+    def begin_run(self) -> None:
+        """Start a new rerun of the current session, dropping the previous one's metrics"""
+        session_id = self._session_id()
+        with self._lock:
+            if self._active(session_id):
+                self._runs[session_id] = []
+                self._runs.move_to_end(session_id)
+                while len(self._runs) > MAX_SESSIONS:
+                    self._runs.popitem(last=False)
+
+    def current_run(self) -> List[CallMetric]:
+        """Metrics recorded so far in the current rerun of this session"""
+        with self._lock:
+            return list(self._runs.get(self._session_id(), []))
+
+    def cache_miss(self) -> None:
+        """Called from inside a cached function body, which only runs on a cache miss"""
+        self._local.misses = getattr(self._local, "misses", 0) + 1
+
+    def record(self, metric: CallMetric, session_id: Optional[str]) -> None:
+        with self._lock:
+            if session_id in self._runs:
+                self._runs[session_id].append(metric)
+        if self.log_all:
+            self.log(metric)
+
+    def log(self, metric: CallMetric) -> None:
+        """Write a metric as one structured log line"""
+        self.logger.info(f"query_metric {json.dumps(asdict(metric))}")
+
+    def instrument(self, name: str, cached: bool = False) -> Callable:
+        """Decorator recording latency, rows, payload size and cache use of a call"""
+        def decorator(fn: Callable) -> Callable:
+            if inspect.isgeneratorfunction(fn):
+                @functools.wraps(fn)
+                def generator_wrapper(*args, **kwargs):
+                    session_id = self._session_id()
+                    if not self._active(session_id):
+                        yield from fn(*args, **kwargs)
+                        return
+                    # Pages are timed and counted until the consumer is done with them
+                    started = time.perf_counter()
+                    rows, size, error = 0, 0, None
+                    try:
+                        for page in fn(*args, **kwargs):
+                            rows += _row_count(page)
+                            size += _payload_bytes(page) or 0
+                            yield page
+                    except Exception as e:
+                        error = str(e)
+                        raise
+                    finally:
+                        self.record(CallMetric(
+                            name, time.perf_counter() - started, rows, size, error=error,
+                            thread=threading.current_thread().name
+                        ), session_id)
+                return generator_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                session_id = self._session_id()
+                if not self._active(session_id):
+                    return fn(*args, **kwargs)
+
+                # Counting instead of a flag keeps nested instrumented calls from resetting it
+                misses = getattr(self._local, "misses", 0)
+                started = time.perf_counter()
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    self.record(CallMetric(
+                        name, time.perf_counter() - started, error=str(e),
+                        thread=threading.current_thread().name
+                    ), session_id)
+                    raise
+                seconds = time.perf_counter() - started
+                self.record(CallMetric(
+                    name, seconds, _row_count(result), _payload_bytes(result),
+                    cache=("miss" if getattr(self._local, "misses", 0) > misses else "hit") if cached else None,
+                    thread=threading.current_thread().name
+                ), session_id)
+                return result
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def summarize(metrics: List[CallMetric]) -> List[Dict[str, Any]]:
+        """Per-call breakdown of a rerun, slowest calls first"""
+        summary: Dict[str, Dict[str, Any]] = {}
+        for metric in metrics:
+            entry = summary.setdefault(metric.name, {
+                "Call": metric.name, "Calls": 0, "Total ms": 0.0, "Max ms": 0.0,
+                "Rows": 0, "Payload KiB": 0.0, "Cache hits": 0, "Cache misses": 0, "Errors": 0,
+            })
+            entry["Calls"] += 1
+            entry["Total ms"] += metric.seconds * 1000
+            entry["Max ms"] = max(entry["Max ms"], metric.seconds * 1000)
+            entry["Rows"] += metric.rows or 0
+            entry["Payload KiB"] += (metric.payload_bytes or 0) / 1024
+            entry["Cache hits"] += metric.cache == "hit"
+            entry["Cache misses"] += metric.cache == "miss"
+            entry["Errors"] += metric.error is not None
+        for entry in summary.values():
+            entry["Total ms"] = round(entry["Total ms"], 2)
+            entry["Max ms"] = round(entry["Max ms"], 2)
+            entry["Payload KiB"] = round(entry["Payload KiB"], 1)
+        return sorted(summary.values(), key=lambda entry: entry["Total ms"], reverse=True)
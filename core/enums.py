@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Iterable, List, Union
 
 class GameFormat(Enum):
     """Available game formats"""
@@ -26,6 +27,31 @@ class Color(Enum):
     def list(cls) -> list[str]:
         return [color.value for color in cls]
 
+    @property
+    def bit(self) -> int:
+        """Bit of this color in a color mask"""
+        return _COLOR_BITS[self]
+
+    @classmethod
+    def to_mask(cls, colors: Iterable[Union['Color', str]]) -> int:
+        """Encode colors or color names as a 5-bit mask, ignoring unknown names"""
+        mask = 0
+        for color in colors or ():
+            mask |= _COLOR_BITS.get(color, 0)
+        return mask
+
+    @classmethod
+    def from_mask(cls, mask: int) -> List['Color']:
+        """Decode a color mask into colors in definition order"""
+        return [color for color in cls if mask & _COLOR_BITS[color]]
+
+# Bit of each color, looked up by member or by value
+_COLOR_BITS = {color: 1 << bit for bit, color in enumerate(Color)}
+_COLOR_BITS.update({color.value: bit for color, bit in list(_COLOR_BITS.items())})
+
+# Number of distinct color masks, including colorless
+COLOR_COMBINATIONS = 1 << len(Color)
+
 class Edition(Enum):
     """Available card editions"""
     NONE = "None"
@@ -1,9 +1,29 @@
+import sys
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 from datetime import datetime
 from .enums import GameFormat, Color, Edition
 
-@dataclass
+# Slotted instances have no per-instance __dict__ (dataclass slots need Python 3.10)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Enum members by stored value, so decoding skips the Enum constructor
+_FORMATS = {game_format.value: game_format for game_format in GameFormat}
+_EDITIONS = {edition.value: edition for edition in Edition}
+
+# Interned color tuples by stored names; every game with the same colors shares one tuple
+_COLOR_TUPLES: Dict[Tuple[str, ...], Tuple[Color, ...]] = {}
+
+
+def _colors(names: Optional[Iterable[str]]) -> Tuple[Color, ...]:
+    key = tuple(names or ())
+    colors = _COLOR_TUPLES.get(key)
+    if colors is None:
+        colors = _COLOR_TUPLES.setdefault(key, tuple(Color(name) for name in key))
+    return colors
+
+
+@dataclass(**_SLOTS)
 class Player:
     """Player model with validation"""
     name: str
@@ -15,14 +35,17 @@ class Player:
         if len(self.name) > 50:
             raise ValueError("Player name too long (max 50 characters)")
 
-@dataclass
+@dataclass(**_SLOTS)
 class Game:
-    """Game model with validation"""
+    """Game model with validation
+
+    Decoded games hold interned color tuples, so treat the colors as read-only.
+    """
     winner_id: int
     loser_id: int
     game_format: GameFormat
-    winner_colors: List[Color]
-    loser_colors: List[Color]
+    winner_colors: Sequence[Color]
+    loser_colors: Sequence[Color]
     edition: Optional[Edition] = None
     played_at: Optional[datetime] = None
     id: Optional[int] = None
@@ -33,6 +56,16 @@ class Game:
         if not self.winner_colors and not self.loser_colors:
             raise ValueError("At least one player must have colors")
 
+    @property
+    def winner_mask(self) -> int:
+        """Winner's colors as a bitmask, see Color.to_mask"""
+        return Color.to_mask(self.winner_colors)
+
+    @property
+    def loser_mask(self) -> int:
+        """Loser's colors as a bitmask, see Color.to_mask"""
+        return Color.to_mask(self.loser_colors)
+
     def to_dict(self) -> dict:
         """Convert game to dictionary for database storage"""
         return {
@@ -48,13 +81,28 @@ class Game:
     @classmethod
     def from_dict(cls, data: dict) -> 'Game':
         """Create game instance from dictionary"""
-        return cls(
-            winner_id=data["winner_id"],
-            loser_id=data["loser_id"],
-            game_format=GameFormat(data["format"]),
-            winner_colors=[Color(c) for c in data["winner_colors"]],
-            loser_colors=[Color(c) for c in data["loser_colors"]],
-            edition=Edition(data["edition"]) if data.get("edition") else None,
-            played_at=datetime.fromisoformat(data["played_at"]) if data.get("played_at") else None,
-            id=data.get("id")
-        )
+        return cls.from_rows([data])[0]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> List['Game']:
+        """Decode a page of database rows in one pass
+
+        Enum members are looked up by value and color lists are interned,
+        so games only allocate what differs between them.
+        """
+        games = []
+        for row in rows:
+            format_value = row["format"]
+            edition_value = row.get("edition")
+            played_at = row.get("played_at")
+            games.append(cls(
+                winner_id=row["winner_id"],
+                loser_id=row["loser_id"],
+                game_format=_FORMATS.get(format_value) or GameFormat(format_value),
+                winner_colors=_colors(row["winner_colors"]),
+                loser_colors=_colors(row["loser_colors"]),
+                edition=(_EDITIONS.get(edition_value) or Edition(edition_value)) if edition_value else None,
+                played_at=datetime.fromisoformat(played_at) if played_at else None,
+                id=row.get("id")
+            ))
+        return games
@@ -0,0 +1,189 @@
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from config.config import config
+from core.enums import Color
+from .paging import iter_game_pages
+from .versioning import VERSIONED_CACHE_TTL
+
+# Wildcard used by the dashboard filters
+ALL = "All"
+
+# (wins, losses) of one player or one matchup
+Record = Tuple[int, int]
+
+# What a counted game contributes: (winner_id, loser_id, edition, format, winner mask, loser mask)
+Entry = Tuple[int, int, Optional[str], str, int, int]
+
+
+class GameAggregates:
+    """Process-wide win/loss counters maintained incrementally on game writes
+
+    Counters are kept per edition and format, including the "All" wildcard for
+    both, so every dashboard filter combination is answered by a single lookup.
+    GameRepository applies a delta for each add, update and delete instead of
+    triggering a full recomputation. Writes made by other processes are only
+    seen by a reload, which happens after VERSIONED_CACHE_TTL like the other
+    data caches.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Compact entry of every counted game by id, so updates and deletes can retract it
+        self._rows: Optional[Dict[int, Entry]] = None
+        self._loaded_at = 0.0
+        # (edition, format) -> Counter[(player_id, won)]
+        self._records: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+        # (edition, format, player_id) -> Counter[(opponent_id, won)]
+        self._matchups: Dict[Tuple[str, str, int], Counter] = defaultdict(Counter)
+        # (edition, format, player_id) -> Counter[(color mask, won)]
+        self._colors: Dict[Tuple[str, str, int], Counter] = defaultdict(Counter)
+
+    def _is_current(self) -> bool:
+        return self._rows is not None and time.monotonic() - self._loaded_at < VERSIONED_CACHE_TTL
+
+    def _load(self) -> None:
+        try:
+            for _ in self.scan(iter_game_pages()):
+                pass
+        except Exception as e:
+            # Stay unloaded so readers fall back to scanning and the next access retries
+            config.logger.error(f"Failed to load game aggregates: {str(e)}")
+
+    def scan(self, pages: Iterable[List[Dict[str, Any]]]) -> Iterator[List[Dict[str, Any]]]:
+        """Pass game pages through, folding them into the counters if those are due for a (re)load
+
+        Lets another full scan, such as building the game table, load the
+        counters too instead of paging all games a second time. Writes wait
+        until the scan has finished, so none of them is lost or counted twice.
+        """
+        self._lock.acquire()
+        if self._is_current():
+            self._lock.release()
+            yield from pages
+            return
+        try:
+            self._records.clear()
+            self._matchups.clear()
+            self._colors.clear()
+            self._rows = {}
+            # Fold each page into the counters as it arrives
+            for page in pages:
+                for game in page:
+                    self._add(game)
+                yield page
+            self._loaded_at = time.monotonic()
+        except BaseException:
+            # Failed or abandoned part way, stay unloaded
+            self._rows = None
+            raise
+        finally:
+            self._lock.release()
+
+    def _ensure_loaded(self) -> bool:
+        if not self._is_current():
+            self._load()
+        return self._rows is not None
+
+    @staticmethod
+    def _entry(game: Dict[str, Any]) -> Entry:
+        edition = game.get("edition") or None
+        return (
+            game["winner_id"],
+            game["loser_id"],
+            sys.intern(edition) if edition else None,
+            sys.intern(game["format"]),
+            Color.to_mask(game.get("winner_colors")),
+            Color.to_mask(game.get("loser_colors")),
+        )
+
+    def _apply(self, entry: Entry, sign: int) -> None:
+        """Add (sign=1) or retract (sign=-1) one game from all counters"""
+        winner_id, loser_id, game_edition, game_format, winner_colors, loser_colors = entry
+        filter_keys = ((game_edition, game_format), (ALL, game_format), (game_edition, ALL), (ALL, ALL))
+
+        for edition, game_format in filter_keys:
+            records = self._records[(edition, game_format)]
+            records[(winner_id, True)] += sign
+            records[(loser_id, False)] += sign
+
+            self._matchups[(edition, game_format, winner_id)][(loser_id, True)] += sign
+            self._matchups[(edition, game_format, loser_id)][(winner_id, False)] += sign
+
+            self._colors[(edition, game_format, winner_id)][(winner_colors, True)] += sign
+            self._colors[(edition, game_format, loser_id)][(loser_colors, False)] += sign
+
+    def _add(self, game: Dict[str, Any]) -> None:
+        game_id = game.get("id")
+        if game_id in self._rows:
+            # Already counted, e.g. an insert that committed while the load was paging
+            return
+        entry = self._entry(game)
+        self._apply(entry, 1)
+        if game_id is not None:
+            self._rows[game_id] = entry
+
+    def add(self, game: Dict[str, Any]) -> None:
+        """Count a newly inserted game row"""
+        with self._lock:
+            if self._rows is not None:
+                self._add(game)
+
+    def update(self, game: Dict[str, Any]) -> None:
+        """Replace the counted version of an updated game row"""
+        with self._lock:
+            if self._rows is None:
+                return
+            previous = self._rows.pop(game["id"], None)
+            if previous is not None:
+                self._apply(previous, -1)
+            self._add(game)
+
+    def remove(self, game_id: int) -> None:
+        """Retract a deleted game"""
+        with self._lock:
+            if self._rows is None:
+                return
+            previous = self._rows.pop(game_id, None)
+            if previous is not None:
+                self._apply(previous, -1)
+
+    def refresh(self) -> None:
+        """Drop all counters so the next access rebuilds them"""
+        with self._lock:
+            self._rows = None
+
+    @staticmethod
+    def _split(counter: Counter) -> Dict[Any, Record]:
+        """Turn a Counter[(key, won)] into {key: (wins, losses)}"""
+        records: Dict[Any, List[int]] = {}
+        for (key, won), count in counter.items():
+            if count:
+                records.setdefault(key, [0, 0])[0 if won else 1] += count
+        return {key: (wins, losses) for key, (wins, losses) in records.items()}
+
+    def player_records(self, edition_filter: str = ALL, format_filter: str = ALL) -> Optional[Dict[int, Record]]:
+        """Wins and losses of every player, or None if the counters are unavailable"""
+        if not self._ensure_loaded():
+            return None
+        with self._lock:
+            return self._split(self._records.get((edition_filter, format_filter), Counter()))
+
+    def matchup_records(self, player_id: int, edition_filter: str = ALL, format_filter: str = ALL) -> Optional[Dict[int, Record]]:
+        """Wins and losses of a player against each opponent"""
+        if not self._ensure_loaded():
+            return None
+        with self._lock:
+            return self._split(self._matchups.get((edition_filter, format_filter, player_id), Counter()))
+
+    def color_records(self, player_id: int, edition_filter: str = ALL, format_filter: str = ALL) -> Optional[Dict[int, Record]]:
+        """Wins and losses of a player per played color combination, keyed by color mask"""
+        if not self._ensure_loaded():
+            return None
+        with self._lock:
+            return self._split(self._colors.get((edition_filter, format_filter, player_id), Counter()))
+
+
+# Create the shared instance
+game_aggregates = GameAggregates()
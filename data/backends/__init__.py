@@ -0,0 +1 @@
+"""Local storage backends implementing the Supabase query chain"""
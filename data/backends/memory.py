@@ -0,0 +1,165 @@
+"""In-process fake of the Supabase client
+
+Keeps all tables in memory and evaluates the query chain in Python. A fixed
+latency per request and a server-side row cap can be configured to reproduce
+the cost of network round trips deterministically, without any network.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from .postgrest import Condition, Group, Node, QueryBuilder, QueryResponse, check_column
+
+# Columns every new row gets unless the insert sets them
+TABLE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "players": {"name": None},
+    "games": {
+        "winner_id": None, "loser_id": None, "format": None, "edition": None,
+        "winner_colors": [], "loser_colors": [], "played_at": None,
+    },
+}
+
+
+def _copy(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a row so that callers never share the stored lists"""
+    return {column: list(value) if isinstance(value, list) else value for column, value in row.items()}
+
+
+def _coerce(value: Any, like: Any) -> Any:
+    """Convert a filter value, which is a string when parsed from or_(), to the column's type"""
+    if not isinstance(value, str) or isinstance(like, str):
+        return value
+    if isinstance(like, bool):
+        return value.lower() == "true"
+    if isinstance(like, int):
+        return int(value)
+    if isinstance(like, float):
+        return float(value)
+    return value
+
+
+def _compare(condition: Condition, actual: Any) -> Optional[bool]:
+    """Evaluate one comparison with SQL semantics, None meaning unknown"""
+    operator, value = condition.operator, condition.value
+    if operator == "is":
+        expected = {"null": None, "true": True, "false": False}[str(value).lower()]
+        return actual is expected
+    if actual is None:
+        return None
+    if operator == "in":
+        return actual in [_coerce(item, actual) for item in value]
+
+    value = _coerce(value, actual)
+    if operator == "eq":
+        return actual == value
+    if operator == "neq":
+        return actual != value
+    if operator == "gt":
+        return actual > value
+    if operator == "gte":
+        return actual >= value
+    if operator == "lt":
+        return actual < value
+    return actual <= value
+
+
+def _sort_key(value: Any) -> tuple:
+    return (value is None, 0 if value is None else value)
+
+
+def _evaluate(node: Node, row: Dict[str, Any]) -> Optional[bool]:
+    if isinstance(node, Group):
+        results = [_evaluate(child, row) for child in node.children]
+        if node.operator == "and":
+            result = False if False in results else (None if None in results else True)
+        else:
+            result = True if True in results else (None if None in results else False)
+    else:
+        result = _compare(node, row.get(node.column))
+    # Negating an unknown result stays unknown
+    return (not result) if node.negated and result is not None else result
+
+
+class MemoryQuery(QueryBuilder):
+    """Query chain evaluated against the in-memory tables"""
+    def __init__(self, client: 'MemoryClient', table: str):
+        super().__init__(table)
+        self.client = client
+
+    def _matches(self, row: Dict[str, Any]) -> bool:
+        return _evaluate(self.filters, row) is True
+
+    def _sorted(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Stable sorts from the last key to the first; NULLs sort as if larger than any value
+        for column, desc in reversed(self.ordering):
+            rows.sort(key=lambda row: _sort_key(row.get(column)), reverse=desc)
+        return rows
+
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if self.columns == ["*"]:
+            return _copy(row)
+        return _copy({column: row.get(column) for column in self.columns})
+
+    def execute(self) -> QueryResponse:
+        self.client.wait()
+        with self.client.lock:
+            rows = self.client.tables.setdefault(self.table, [])
+
+            if self.action == "insert":
+                payload = self.payload if isinstance(self.payload, list) else [self.payload]
+                inserted = [self.client.new_row(self.table, data) for data in payload]
+                rows.extend(inserted)
+                return QueryResponse([_copy(row) for row in inserted])
+
+            matched = [row for row in rows if self._matches(row)]
+            if self.action == "update":
+                for row in matched:
+                    row.update(_copy({check_column(column): value for column, value in self.payload.items()}))
+                return QueryResponse([_copy(row) for row in matched])
+            if self.action == "delete":
+                removed = {id(row) for row in matched}
+                rows[:] = [row for row in rows if id(row) not in removed]
+                return QueryResponse([_copy(row) for row in matched])
+
+            matched = self._sorted(matched)
+            if self.row_limit is not None:
+                matched = matched[:self.row_limit]
+            if self.client.max_rows is not None:
+                # Like the max-rows setting of PostgREST, silently truncate large results
+                matched = matched[:self.client.max_rows]
+            return QueryResponse([self._project(row) for row in matched])
+
+
+class MemoryClient:
+    """Drop-in replacement for the Supabase client keeping all data in memory"""
+    def __init__(self, latency: float = 0.0, max_rows: Optional[int] = None):
+        self.latency = latency
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self._next_ids: Dict[str, int] = {}
+        self.requests = 0
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def wait(self) -> None:
+        """Simulate the round trip of one request"""
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def new_row(self, table: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        row = _copy(TABLE_DEFAULTS.get(table, {}))
+        row.update(_copy({check_column(column): value for column, value in data.items()}))
+        if row.get("id") is None:
+            row["id"] = self._next_ids.get(table, 1)
+        self._next_ids[table] = max(self._next_ids.get(table, 1), row["id"] + 1)
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        return row
+
+    def load(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Bulk load rows without simulated latency, e.g. to seed test data"""
+        with self.lock:
+            self.tables.setdefault(table, []).extend(self.new_row(table, data) for data in rows)
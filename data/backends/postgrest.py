@@ -0,0 +1,251 @@
+"""Parsing of the PostgREST filter syntax used by the repositories
+
+Local backends accept the same fluent query chain as the Supabase client,
+including logic trees passed to or_(), e.g.
+``winner_id.eq.3,and(played_at.eq."2024-01-01T10:00:00",id.gt.7)``.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Union
+
+COLUMN_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+OPERATORS = {"eq", "neq", "gt", "gte", "lt", "lte", "is", "in"}
+
+
+@dataclass
+class Condition:
+    """A single column comparison"""
+    column: str
+    operator: str
+    value: Any
+    negated: bool = False
+
+
+@dataclass
+class Group:
+    """Conditions combined with and/or"""
+    operator: str
+    children: List['Node'] = field(default_factory=list)
+    negated: bool = False
+
+
+Node = Union[Condition, Group]
+
+
+@dataclass
+class QueryResponse:
+    """Result of an executed query, shaped like the Supabase response"""
+    data: List[dict]
+    count: Any = None
+
+
+def check_column(column: str) -> str:
+    """Reject anything that is not a plain column name"""
+    if not COLUMN_PATTERN.match(column):
+        raise ValueError(f"Invalid column name: {column!r}")
+    return column
+
+
+def parse_order(column: str, desc: bool = False) -> List[tuple]:
+    """Split an order() argument such as "played_at,id" into (column, desc) pairs"""
+    terms = []
+    for term in column.split(","):
+        parts = term.strip().split(".")
+        term_desc = desc
+        if "desc" in parts[1:]:
+            term_desc = True
+        elif "asc" in parts[1:]:
+            term_desc = False
+        terms.append((check_column(parts[0]), term_desc))
+    return terms
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"{message} at position {self.pos} in filter {self.text!r}")
+
+    def peek(self, token: str) -> bool:
+        return self.text.startswith(token, self.pos)
+
+    def expect(self, token: str) -> None:
+        if not self.peek(token):
+            raise self.error(f"Expected {token!r}")
+        self.pos += len(token)
+
+    def parse_list(self, closing: str = "") -> List[Node]:
+        nodes = [self.parse_node()]
+        while self.peek(","):
+            self.pos += 1
+            nodes.append(self.parse_node())
+        if closing:
+            self.expect(closing)
+        elif self.pos != len(self.text):
+            raise self.error("Unexpected input")
+        return nodes
+
+    def parse_node(self) -> Node:
+        negated = False
+        if self.peek("not."):
+            negated = True
+            self.pos += len("not.")
+        for operator in ("and", "or"):
+            if self.peek(f"{operator}("):
+                self.pos += len(operator) + 1
+                return Group(operator, self.parse_list(")"), negated)
+        if negated:
+            # Comparisons are negated through their operator, e.g. "id.not.eq.1"
+            raise self.error("Expected and( or or( after not.")
+        return self.parse_condition()
+
+    def parse_condition(self) -> Condition:
+        column = self.read_until(".")
+        self.expect(".")
+        negated = False
+        operator = self.read_until(".")
+        if operator == "not":
+            negated = True
+            self.expect(".")
+            operator = self.read_until(".")
+        if operator not in OPERATORS:
+            raise self.error(f"Unsupported operator {operator!r}")
+        self.expect(".")
+
+        if operator == "in":
+            self.expect("(")
+            values = []
+            while self.pos < len(self.text) and not self.peek(")"):
+                values.append(self.read_value(",)"))
+                if self.peek(","):
+                    self.pos += 1
+            self.expect(")")
+            return Condition(check_column(column), operator, values, negated)
+        return Condition(check_column(column), operator, self.read_value(",)"), negated)
+
+    def read_until(self, stops: str) -> str:
+        start = self.pos
+        while self.pos < len(self.text) and self.text[self.pos] not in stops:
+            self.pos += 1
+        return self.text[start:self.pos]
+
+    def read_value(self, stops: str) -> str:
+        if self.peek('"'):
+            # Quoted values may contain reserved characters such as "," and ")"
+            self.pos += 1
+            value = []
+            while self.pos < len(self.text) and not self.peek('"'):
+                if self.peek("\\"):
+                    self.pos += 1
+                value.append(self.text[self.pos])
+                self.pos += 1
+            self.expect('"')
+            return "".join(value)
+        return self.read_until(stops)
+
+
+def parse_logic_tree(filters: str, operator: str = "or") -> Group:
+    """Parse the argument of an or_() call into a filter tree"""
+    return Group(operator, _Parser(filters).parse_list())
+
+
+def or_filter(query, filters: str):
+    """Add an or=(...) filter to a query of any backend
+
+    The pinned Supabase client (postgrest 0.10/0.11) has no or_() on its
+    query builders, so the raw PostgREST parameter is added there instead.
+    """
+    if hasattr(query, "or_"):
+        return query.or_(filters)
+    query.params = query.params.add("or", f"({filters})")
+    return query
+
+
+class QueryBuilder:
+    """Fluent query chain mirroring the subset of the Supabase client we use
+
+    Backends subclass it and implement execute() from the collected action,
+    filters, ordering and limit.
+    """
+    def __init__(self, table: str):
+        self.table = check_column(table)
+        self.action = "select"
+        self.columns = ["*"]
+        self.payload: Any = None
+        self.filters = Group("and")
+        self.ordering: List[tuple] = []
+        self.row_limit = None
+        self._negate_next = False
+
+    def select(self, *columns: str) -> 'QueryBuilder':
+        self.action = "select"
+        names = [c.strip() for column in (columns or ("*",)) for c in column.split(",")]
+        self.columns = ["*"] if "*" in names else [check_column(c) for c in names]
+        return self
+
+    def insert(self, data) -> 'QueryBuilder':
+        self.action = "insert"
+        self.payload = data
+        return self
+
+    def update(self, data: dict) -> 'QueryBuilder':
+        self.action = "update"
+        self.payload = data
+        return self
+
+    def delete(self) -> 'QueryBuilder':
+        self.action = "delete"
+        return self
+
+    @property
+    def not_(self) -> 'QueryBuilder':
+        self._negate_next = True
+        return self
+
+    def filter(self, column: str, operator: str, value: Any) -> 'QueryBuilder':
+        if operator not in OPERATORS:
+            raise ValueError(f"Unsupported operator {operator!r}")
+        self.filters.children.append(Condition(check_column(column), operator, value, self._negate_next))
+        self._negate_next = False
+        return self
+
+    def eq(self, column: str, value: Any) -> 'QueryBuilder':
+        return self.filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> 'QueryBuilder':
+        return self.filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> 'QueryBuilder':
+        return self.filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> 'QueryBuilder':
+        return self.filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> 'QueryBuilder':
+        return self.filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> 'QueryBuilder':
+        return self.filter(column, "lte", value)
+
+    def is_(self, column: str, value: Any) -> 'QueryBuilder':
+        return self.filter(column, "is", value)
+
+    def in_(self, column: str, values) -> 'QueryBuilder':
+        return self.filter(column, "in", list(values))
+
+    def or_(self, filters: str) -> 'QueryBuilder':
+        self.filters.children.append(parse_logic_tree(filters))
+        return self
+
+    def order(self, column: str, *, desc: bool = False) -> 'QueryBuilder':
+        self.ordering.extend(parse_order(column, desc))
+        return self
+
+    def limit(self, size: int) -> 'QueryBuilder':
+        self.row_limit = size
+        return self
+
+    def execute(self) -> QueryResponse:
+        raise NotImplementedError
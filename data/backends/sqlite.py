@@ -0,0 +1,153 @@
+"""Embedded SQLite storage backend
+
+Implements the query chain of the Supabase client on top of a local SQLite
+file, so the repositories run unchanged without any network round trip.
+"""
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Tuple
+from .postgrest import Group, Node, QueryBuilder, QueryResponse, check_column
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    winner_id INTEGER NOT NULL,
+    loser_id INTEGER NOT NULL,
+    format TEXT NOT NULL,
+    edition TEXT,
+    winner_colors TEXT NOT NULL DEFAULT '[]',
+    loser_colors TEXT NOT NULL DEFAULT '[]',
+    played_at TEXT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_games_played_at ON games (played_at, id);
+CREATE INDEX IF NOT EXISTS idx_games_winner ON games (winner_id, played_at);
+CREATE INDEX IF NOT EXISTS idx_games_loser ON games (loser_id, played_at);
+CREATE INDEX IF NOT EXISTS idx_games_edition ON games (edition, played_at);
+CREATE INDEX IF NOT EXISTS idx_games_format ON games (format, played_at);
+"""
+
+# Columns holding lists, stored as JSON text
+JSON_COLUMNS = {"winner_colors", "loser_colors"}
+
+COMPARISONS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+IS_VALUES = {"null": "NULL", "true": "TRUE", "false": "FALSE"}
+
+
+def _encode(column: str, value: Any) -> Any:
+    if column in JSON_COLUMNS and not isinstance(value, str):
+        return json.dumps(value or [])
+    return value
+
+
+def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+    data = dict(row)
+    for column in JSON_COLUMNS & data.keys():
+        data[column] = json.loads(data[column]) if data[column] else []
+    return data
+
+
+def _compile(node: Node, params: List[Any]) -> str:
+    """Translate a filter tree into a SQL expression with bound parameters"""
+    if isinstance(node, Group):
+        if not node.children:
+            sql = "1"
+        else:
+            joiner = " AND " if node.operator == "and" else " OR "
+            sql = "(" + joiner.join(_compile(child, params) for child in node.children) + ")"
+    elif node.operator == "is":
+        keyword = IS_VALUES.get(str(node.value).lower())
+        if keyword is None:
+            raise ValueError(f"Unsupported is value {node.value!r}")
+        sql = f"{node.column} IS {keyword}"
+    elif node.operator == "in":
+        params.extend(node.value)
+        sql = f"{node.column} IN ({', '.join('?' for _ in node.value)})"
+    else:
+        params.append(node.value)
+        sql = f"{node.column} {COMPARISONS[node.operator]} ?"
+    return f"NOT {sql}" if node.negated else sql
+
+
+class SQLiteQuery(QueryBuilder):
+    """Query chain executed against the local database"""
+    def __init__(self, client: 'SQLiteClient', table: str):
+        super().__init__(table)
+        self.client = client
+
+    def _where(self, params: List[Any]) -> str:
+        return f" WHERE {_compile(self.filters, params)}" if self.filters.children else ""
+
+    def _select_sql(self) -> Tuple[str, List[Any]]:
+        params: List[Any] = []
+        sql = f"SELECT {', '.join(self.columns)} FROM {self.table}{self._where(params)}"
+        if self.ordering:
+            # Match Postgres, which sorts NULLs as if larger than any value
+            sql += " ORDER BY " + ", ".join(
+                f"{column} {'DESC NULLS FIRST' if desc else 'ASC NULLS LAST'}"
+                for column, desc in self.ordering
+            )
+        if self.row_limit is not None:
+            sql += " LIMIT ?"
+            params.append(self.row_limit)
+        return sql, params
+
+    def execute(self) -> QueryResponse:
+        if self.action == "select":
+            return QueryResponse(self.client.run([self._select_sql()]))
+
+        if self.action == "insert":
+            rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            statements = []
+            for row in rows:
+                columns = [check_column(column) for column in row]
+                statements.append((
+                    f"INSERT INTO {self.table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)}) RETURNING *",
+                    [_encode(column, row[column]) for column in columns],
+                ))
+            return QueryResponse(self.client.run(statements))
+
+        params: List[Any] = []
+        if self.action == "update":
+            assignments = ", ".join(f"{check_column(column)} = ?" for column in self.payload)
+            params.extend(_encode(column, value) for column, value in self.payload.items())
+            sql = f"UPDATE {self.table} SET {assignments}{self._where(params)} RETURNING *"
+        else:
+            sql = f"DELETE FROM {self.table}{self._where(params)} RETURNING *"
+        return QueryResponse(self.client.run([(sql, params)]))
+
+
+class SQLiteClient:
+    """Drop-in replacement for the Supabase client backed by a local file"""
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # Streamlit serves sessions on separate threads; access is serialized by the lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def table(self, name: str) -> SQLiteQuery:
+        return SQLiteQuery(self, name)
+
+    def run(self, statements: List[Tuple[str, List[Any]]]) -> List[Dict[str, Any]]:
+        """Execute statements in one transaction and return all resulting rows"""
+        rows: List[Dict[str, Any]] = []
+        with self._lock, self._connection:
+            for sql, params in statements:
+                rows.extend(_decode(row) for row in self._connection.execute(sql, params).fetchall())
+        return rows
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,70 @@
+"""Supabase client with a pooled, keep-alive HTTP session
+
+The default client opens its PostgREST session without connection limits or
+a tuned timeout. Here the session is replaced by one with a bounded
+keep-alive pool, so concurrent Streamlit sessions reuse warm TLS
+connections instead of handshaking again.
+"""
+from dataclasses import dataclass
+from config.config import config
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """HTTP settings of the database session"""
+    timeout: float = 10.0
+    connect_timeout: float = 5.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+
+    @classmethod
+    def from_settings(cls) -> 'PoolSettings':
+        """Read the DB_* settings, keeping the defaults for unset ones"""
+        defaults = cls()
+        return cls(
+            timeout=float(config.get_setting("DB_TIMEOUT", defaults.timeout)),
+            connect_timeout=float(config.get_setting("DB_CONNECT_TIMEOUT", defaults.connect_timeout)),
+            max_connections=int(config.get_setting("DB_MAX_CONNECTIONS", defaults.max_connections)),
+            max_keepalive_connections=int(config.get_setting("DB_MAX_KEEPALIVE", defaults.max_keepalive_connections)),
+            keepalive_expiry=float(config.get_setting("DB_KEEPALIVE_EXPIRY", defaults.keepalive_expiry)),
+            http2=str(config.get_setting("DB_HTTP2", "")).lower() in ("1", "true", "yes"),
+        )
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_pooled_client(url: str, key: str, settings: PoolSettings):
+    """Create a Supabase client whose PostgREST session uses a bounded keep-alive pool"""
+    import httpx
+    from postgrest.utils import SyncClient
+    from supabase import create_client
+
+    client = create_client(url, key)
+    http2 = settings.http2
+    if http2 and not _http2_available():
+        config.logger.warning("DB_HTTP2 is set but the h2 package is missing, using HTTP/1.1")
+        http2 = False
+
+    # Keep the headers the client set up (API key, auth, schema profile)
+    previous = client.postgrest.session
+    client.postgrest.session = SyncClient(
+        base_url=previous.base_url,
+        headers=previous.headers,
+        timeout=httpx.Timeout(settings.timeout, connect=settings.connect_timeout),
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        ),
+        http2=http2,
+    )
+    previous.close()
+    return client
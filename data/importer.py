@@ -0,0 +1,118 @@
+"""Bulk import of historical games from CSV or JSON files
+
+Usage: python -m data.importer games.csv [--chunk-size 500]
+
+Each record needs winner, loser (player names, or winner_id/loser_id), format
+and optionally edition, winner_colors, loser_colors and played_at (ISO 8601).
+In CSV files colors are separated by ";" or ",".
+"""
+import argparse
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+from config.config import config
+from core.enums import GameFormat, Color, Edition
+from core.models import Game
+from .player_directory import player_directory
+from .repositories import GameRepository, BulkInsertResult, INSERT_CHUNK_SIZE
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import"""
+    total: int = 0
+    # (record number, error message) of records that could not be parsed
+    rejected: List[Tuple[int, str]] = field(default_factory=list)
+    result: BulkInsertResult = field(default_factory=BulkInsertResult)
+
+
+def read_records(path: str) -> List[Dict[str, Any]]:
+    """Read game records from a CSV or JSON file"""
+    file_path = Path(path)
+    with file_path.open(encoding="utf-8-sig", newline="") as f:
+        if file_path.suffix.lower() == ".json":
+            records = json.load(f)
+            if not isinstance(records, list):
+                raise ValueError("JSON import file must contain a list of games")
+            return records
+        return list(csv.DictReader(f))
+
+
+def _colors(value: Any) -> List[Color]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace(";", ",").split(",")
+    return [Color(c.strip()) for c in value if c.strip()]
+
+
+def _player_id(record: Dict[str, Any], role: str, name_map: Dict[str, int]) -> int:
+    if record.get(f"{role}_id") not in (None, ""):
+        return int(record[f"{role}_id"])
+    name = (record.get(role) or "").strip()
+    if name not in name_map:
+        raise ValueError(f"Unknown {role} player: {name!r}")
+    return name_map[name]
+
+
+def parse_record(record: Dict[str, Any], name_map: Dict[str, int]) -> Game:
+    """Convert one import record into a Game"""
+    edition = record.get("edition")
+    played_at = record.get("played_at")
+    return Game(
+        winner_id=_player_id(record, "winner", name_map),
+        loser_id=_player_id(record, "loser", name_map),
+        game_format=GameFormat(record["format"]),
+        winner_colors=_colors(record.get("winner_colors")),
+        loser_colors=_colors(record.get("loser_colors")),
+        edition=Edition(edition) if edition and edition != Edition.NONE.value else None,
+        played_at=datetime.fromisoformat(played_at) if played_at else None,
+    )
+
+
+def import_games(path: str, chunk_size: int = INSERT_CHUNK_SIZE) -> ImportReport:
+    """Import all games of a CSV or JSON file with batched inserts"""
+    records = read_records(path)
+    report = ImportReport(total=len(records))
+
+    # Resolve all player names against one in-memory lookup
+    name_map = player_directory.name_map()
+    games: List[Game] = []
+    record_numbers: List[int] = []
+    for number, record in enumerate(records, start=1):
+        try:
+            games.append(parse_record(record, name_map))
+            record_numbers.append(number)
+        except (KeyError, ValueError) as e:
+            report.rejected.append((number, f"{type(e).__name__}: {e}"))
+
+    report.result = GameRepository.add_many(games, chunk_size=chunk_size)
+
+    # Report positions as record numbers of the input file
+    report.result.invalid = [(record_numbers[i], message) for i, message in report.result.invalid]
+    report.result.failed_chunks = [
+        (record_numbers[first], record_numbers[last], message)
+        for first, last, message in report.result.failed_chunks
+    ]
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import games from a CSV or JSON file")
+    parser.add_argument("path", help="CSV or JSON file with one game per record")
+    parser.add_argument("--chunk-size", type=int, default=INSERT_CHUNK_SIZE, help="games per insert request")
+    args = parser.parse_args()
+
+    report = import_games(args.path, chunk_size=args.chunk_size)
+    for number, message in report.rejected + report.result.invalid:
+        config.logger.warning(f"Record {number} skipped: {message}")
+    for first, last, message in report.result.failed_chunks:
+        config.logger.error(f"Records {first}-{last} failed: {message}")
+    config.logger.info(f"Imported {len(report.result.inserted)} of {report.total} games")
+
+
+if __name__ == "__main__":
+    main()
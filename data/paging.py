@@ -0,0 +1,41 @@
+from typing import List, Dict, Any, Iterator, Optional
+from config.config import config
+from .retry import execute_read
+from .backends.postgrest import or_filter
+
+# Supabase caps responses at 1000 rows by default; larger pages would only come back short
+PAGE_SIZE = 1000
+
+
+def _after(row: Dict[str, Any]) -> str:
+    """Keyset filter selecting the games ordered after the given row"""
+    if row.get("played_at") is None:
+        # Games without a timestamp sort last, ordered by id only
+        return f"and(played_at.is.null,id.gt.{row['id']})"
+    played_at = row["played_at"]
+    return (
+        f'played_at.gt."{played_at}",'
+        f'and(played_at.eq."{played_at}",id.gt.{row["id"]}),'
+        f"played_at.is.null"
+    )
+
+
+def iter_game_pages(page_size: int = PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Stream all games in (played_at, id) order, one page at a time
+
+    Uses keyset pagination so every page is an indexed range scan and no
+    single response has to hold the whole table.
+    """
+    last: Optional[Dict[str, Any]] = None
+    while True:
+        # Postgres sorts NULL timestamps last in ascending order
+        query = config.db.table("games").select("*").order("played_at,id")
+        if last is not None:
+            query = or_filter(query, _after(last))
+        page = execute_read(query.limit(page_size)).data
+
+        # A short page is not the end: the server may cap responses below page_size
+        if not page:
+            return
+        yield page
+        last = page[-1]
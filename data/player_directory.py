@@ -0,0 +1,91 @@
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from config.config import config
+from .retry import execute_read
+from .versioning import VERSIONED_CACHE_TTL
+
+class PlayerDirectory:
+    """Process-wide in-memory index of all players
+
+    Loaded with a single query on first use and kept up to date by
+    PlayerRepository.add/delete, so name lookups never hit the database.
+    Game writes leave it alone. It is reloaded after VERSIONED_CACHE_TTL,
+    which picks up players added by other processes.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._players: Optional[List[Dict[str, Any]]] = None
+        self._names_by_id: Dict[int, str] = {}
+        self._ids_by_name: Dict[str, int] = {}
+        self._loaded_at = 0.0
+
+    def _is_current(self) -> bool:
+        return (
+            self._players is not None
+            and time.monotonic() - self._loaded_at < VERSIONED_CACHE_TTL
+        )
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._is_current():
+                return
+            try:
+                players = execute_read(config.db.table("players").select("*")).data
+            except Exception as e:
+                # Keep the previous players, if any, and retry on the next access
+                config.logger.error(f"Failed to load player directory: {str(e)}")
+                return
+            self._index(players)
+            self._loaded_at = time.monotonic()
+
+    def _index(self, players: List[Dict[str, Any]]) -> None:
+        # Swap in fresh containers so concurrent readers never see partial updates
+        self._names_by_id = {p["id"]: p["name"] for p in players}
+        self._ids_by_name = {p["name"]: p["id"] for p in players}
+        self._players = players
+
+    def _ensure_loaded(self) -> None:
+        if not self._is_current():
+            self._load()
+
+    def get_all(self) -> List[Dict[str, Any]]:
+        """Get all players"""
+        self._ensure_loaded()
+        return list(self._players or [])
+
+    def get_name(self, player_id: int) -> Optional[str]:
+        """Get player name by ID"""
+        self._ensure_loaded()
+        return self._names_by_id.get(player_id)
+
+    def get_id(self, name: str) -> Optional[int]:
+        """Get player ID by name"""
+        self._ensure_loaded()
+        return self._ids_by_name.get(name)
+
+    def name_map(self) -> Dict[str, int]:
+        """Get a mapping of player names to IDs"""
+        self._ensure_loaded()
+        return dict(self._ids_by_name)
+
+    def add(self, player: Dict[str, Any]) -> None:
+        """Register a newly inserted player row"""
+        with self._lock:
+            if self._players is not None:
+                self._index(self._players + [player])
+
+    def remove(self, player_id: int) -> None:
+        """Forget a deleted player"""
+        with self._lock:
+            if self._players is not None:
+                self._index([p for p in self._players if p["id"] != player_id])
+
+    def refresh(self) -> None:
+        """Drop the loaded players so the next access reloads them"""
+        with self._lock:
+            self._players = None
+
+
+# Create the shared instance
+player_directory = PlayerDirectory()
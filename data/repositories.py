@@ -1,11 +1,33 @@
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterator, Optional
 from config.config import config
 from core.models import Player, Game
+from .player_directory import player_directory
+from .aggregates import game_aggregates
+from .versioning import data_version
+from .paging import iter_game_pages, PAGE_SIZE
+from .backends.postgrest import or_filter
+from .retry import execute_read
 from datetime import datetime, timedelta
 
+# Rows per insert request in GameRepository.add_many
+INSERT_CHUNK_SIZE = 500
+
+
+@dataclass
+class BulkInsertResult:
+    """Outcome of GameRepository.add_many"""
+    inserted: List[Dict[str, Any]] = field(default_factory=list)
+    # (index of the game in the input, validation message)
+    invalid: List[tuple] = field(default_factory=list)
+    # (first index, last index, error message) of chunks the database rejected
+    failed_chunks: List[tuple] = field(default_factory=list)
+
+
 class PlayerRepository:
     """Repository for player-related database operations"""
     @staticmethod
+    @config.metrics.instrument("PlayerRepository.add")
     def add(name: str) -> Dict[str, Any]:
         try:
             player = Player(name=name)
@@ -16,40 +38,46 @@ class PlayerRepository:
 
             if not response.data:
                 raise Exception("No data returned from database")
+            player_directory.add(response.data[0])
+            data_version.bump()
             return response.data[0]
         except Exception as e:
             config.logger.error(f"Failed to add player: {str(e)}")
             raise ValueError(f"Failed to add player: {str(e)}")
 
     @staticmethod
+    @config.metrics.instrument("PlayerRepository.delete")
     def delete(player_id: int) -> None:
         try:
             config.logger.info(f"Deleting player with ID: {player_id}")
             response = config.db.table("players").delete().eq("id", player_id).execute()
             if not response.data:
                 raise Exception("No data returned from database")
+            player_directory.remove(player_id)
+            data_version.bump()
         except Exception as e:
             config.logger.error(f"Failed to delete player: {str(e)}")
             raise ValueError(f"Failed to delete player: {str(e)}")
 
     @staticmethod
+    @config.metrics.instrument("PlayerRepository.get_all")
     def get_all() -> List[Dict[str, Any]]:
         try:
-            response = config.db.table("players").select("*").execute()
+            response = execute_read(config.db.table("players").select("*"))
             return response.data
         except Exception as e:
             config.logger.error(f"Failed to fetch players: {str(e)}")
             return []
 
     @staticmethod
+    @config.metrics.instrument("PlayerRepository.get_by_id")
     def get_by_id(player_id: int) -> Optional[str]:
         try:
-            response = (
+            response = execute_read(
                 config.db.table("players")
                 .select("name")
                 .eq("id", player_id)
                 .limit(1)
-                .execute()
             )
             return response.data[0]["name"] if response.data else None
         except Exception as e:
@@ -60,6 +88,7 @@ class PlayerRepository:
 class GameRepository:
     """Repository for game-related database operations"""
     @staticmethod
+    @config.metrics.instrument("GameRepository.add")
     def add(game: Game) -> Dict[str, Any]:
         try:
             game.validate()
@@ -68,12 +97,50 @@ class GameRepository:
             response = config.db.table("games").insert(game.to_dict()).execute()
             if not response.data:
                 raise Exception("No data returned from database")
+            game_aggregates.add(response.data[0])
+            data_version.bump()
             return response.data[0]
         except Exception as e:
             config.logger.error(f"Failed to add game: {str(e)}")
             raise ValueError(f"Failed to add game: {str(e)}")
 
     @staticmethod
+    @config.metrics.instrument("GameRepository.add_many")
+    def add_many(games: List[Game], chunk_size: int = INSERT_CHUNK_SIZE) -> BulkInsertResult:
+        """Insert many games in chunked batch requests
+
+        All games are validated first; invalid ones are reported and skipped.
+        A failing chunk is reported and does not stop the following chunks.
+        """
+        result = BulkInsertResult()
+        valid = []
+        for index, game in enumerate(games):
+            try:
+                game.validate()
+                valid.append((index, game.to_dict()))
+            except ValueError as e:
+                result.invalid.append((index, str(e)))
+
+        config.logger.info(f"Adding {len(valid)} games in chunks of {chunk_size}")
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            try:
+                response = config.db.table("games").insert([row for _, row in chunk]).execute()
+                if not response.data:
+                    raise Exception("No data returned from database")
+                for row in response.data:
+                    game_aggregates.add(row)
+                result.inserted.extend(response.data)
+            except Exception as e:
+                config.logger.error(f"Failed to add games {chunk[0][0]}-{chunk[-1][0]}: {str(e)}")
+                result.failed_chunks.append((chunk[0][0], chunk[-1][0], str(e)))
+
+        if result.inserted:
+            data_version.bump()
+        return result
+
+    @staticmethod
+    @config.metrics.instrument("GameRepository.update")
     def update(game_id: int, game: Game) -> Dict[str, Any]:
         """Update an existing game"""
         try:
@@ -85,23 +152,29 @@ class GameRepository:
 
             if not response.data:
                 raise Exception("No data returned from database")
+            game_aggregates.update(response.data[0])
+            data_version.bump()
             return response.data[0]
         except Exception as e:
             config.logger.error(f"Failed to update game {game_id}: {str(e)}")
             raise ValueError(f"Failed to update game: {str(e)}")
 
     @staticmethod
+    @config.metrics.instrument("GameRepository.delete")
     def delete(game_id: int) -> None:
         try:
             config.logger.info(f"Deleting game with ID: {game_id}")
             response = config.db.table("games").delete().eq("id", game_id).execute()
             if not response.data:
                 raise Exception("No data returned from database")
+            game_aggregates.remove(game_id)
+            data_version.bump()
         except Exception as e:
             config.logger.error(f"Failed to delete game {game_id}: {str(e)}")
             raise ValueError(f"Failed to delete game: {str(e)}")
 
     @staticmethod
+    @config.metrics.instrument("GameRepository.get_filtered_games")
     def get_filtered_games(
         start_date=None,
         end_date=None,
@@ -126,69 +199,73 @@ class GameRepository:
                     query = query.eq("format", format_filter)
                 return query
 
-            # If player filter is active, combine winner and loser games
-            if player_id:
-                # Get games where player is winner
-                winner_query = config.db.table("games").select("*")
-                winner_query = apply_common_filters(winner_query)
-                winner_games = winner_query.eq("winner_id", player_id).execute().data
-
-                # Get games where player is loser
-                loser_query = config.db.table("games").select("*")
-                loser_query = apply_common_filters(loser_query)
-                loser_games = loser_query.eq("loser_id", player_id).execute().data
+            def ordered_query(query):
+                query = apply_common_filters(query).order("played_at", desc=True)
+                return query.limit(limit) if limit else query
 
-                # Combine and sort the results
-                all_games = winner_games + loser_games
-                all_games.sort(key=lambda x: x["played_at"], reverse=True)
-                return all_games[:limit] if limit else all_games
+            # If player filter is active, match winner or loser in one limited query
+            if player_id:
+                query = or_filter(
+                    config.db.table("games").select("*"),
+                    f"winner_id.eq.{player_id},loser_id.eq.{player_id}"
+                )
+                return execute_read(ordered_query(query)).data
 
             # If no player filter, use single query with all filters
-            query = config.db.table("games").select("*")
-            query = apply_common_filters(query)
-            query = query.order("played_at", desc=True)
-            if limit:
-                query = query.limit(limit)
-
-            return query.execute().data
+            return execute_read(ordered_query(config.db.table("games").select("*"))).data
         except Exception as e:
             config.logger.error(f"Failed to fetch filtered games: {str(e)}")
             return []
 
     @staticmethod
+    @config.metrics.instrument("GameRepository.get_recent")
     def get_recent(limit: Optional[int] = None) -> List[Dict[str, Any]]:
         try:
-            query = config.db.table("games").select("*").order("played_at", desc=True)
+            query = config.db.table("games").select("*").order("played_at.desc,id.desc")
             if limit is not None:
                 query = query.limit(limit)
-            return query.execute().data
+            return execute_read(query).data
         except Exception as e:
             config.logger.error(f"Failed to fetch recent games: {str(e)}")
             return []
 
     @staticmethod
+    @config.metrics.instrument("GameRepository.iter_pages")
+    def iter_pages(page_size: int = PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """Stream all games in (played_at, id) order, one page at a time"""
+        try:
+            yield from iter_game_pages(page_size)
+        except Exception as e:
+            config.logger.error(f"Failed to fetch game page: {str(e)}")
+            raise
+
+    @staticmethod
+    @config.metrics.instrument("GameRepository.get_all")
     def get_all() -> List[Dict[str, Any]]:
         try:
-            return config.db.table("games").select("*").execute().data
+            return [game for page in GameRepository.iter_pages() for game in page]
         except Exception as e:
             config.logger.error(f"Failed to fetch all games: {str(e)}")
             return []
 
     @staticmethod
+    @config.metrics.instrument("GameRepository.get_by_player")
     def get_by_player(player_id: int) -> List[Dict[str, Any]]:
         try:
-            return config.db.table("games").select("*").or_(
+            return execute_read(or_filter(
+                config.db.table("games").select("*"),
                 f"winner_id.eq.{player_id},loser_id.eq.{player_id}"
-            ).execute().data
+            )).data
         except Exception as e:
             config.logger.error(f"Failed to fetch games for player {player_id}: {str(e)}")
             return []
 
     @staticmethod
+    @config.metrics.instrument("GameRepository.get_by_id")
     def get_by_id(game_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific game by ID"""
         try:
-            response = config.db.table("games").select("*").eq("id", game_id).limit(1).execute()
+            response = execute_read(config.db.table("games").select("*").eq("id", game_id).limit(1))
             return response.data[0] if response.data else None
         except Exception as e:
             config.logger.error(f"Failed to fetch game {game_id}: {str(e)}")
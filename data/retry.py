@@ -0,0 +1,73 @@
+import random
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from config.config import config
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retries of idempotent reads with exponential backoff and full jitter"""
+    attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+
+    @classmethod
+    def from_settings(cls) -> 'RetryPolicy':
+        defaults = cls()
+        return cls(
+            # Every read is tried at least once, whatever the setting
+            attempts=max(1, int(config.get_setting("DB_READ_ATTEMPTS", defaults.attempts))),
+            base_delay=float(config.get_setting("DB_RETRY_BASE_DELAY", defaults.base_delay)),
+            max_delay=float(config.get_setting("DB_RETRY_MAX_DELAY", defaults.max_delay)),
+        )
+
+    def delay(self, retry: int) -> float:
+        # Full jitter keeps sessions that failed together from retrying in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+_policy: Optional[RetryPolicy] = None
+
+
+def _default_policy() -> RetryPolicy:
+    global _policy
+    if _policy is None:
+        _policy = RetryPolicy.from_settings()
+    return _policy
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether an error is worth retrying: timeouts, dropped connections and locks"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    if isinstance(error, sqlite3.OperationalError):
+        return "locked" in str(error) or "busy" in str(error)
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(error, httpx.TransportError)
+
+
+def with_retry(read: Callable[[], Any], policy: Optional[RetryPolicy] = None) -> Any:
+    """Call an idempotent read, retrying transient failures"""
+    policy = policy or _default_policy()
+    for retry in range(policy.attempts):
+        try:
+            return read()
+        except Exception as e:
+            if retry == policy.attempts - 1 or not is_transient(e):
+                raise
+            delay = policy.delay(retry)
+            config.logger.warning(f"Transient database error, retrying in {delay:.2f}s: {str(e)}")
+            time.sleep(delay)
+
+
+def execute_read(query, policy: Optional[RetryPolicy] = None):
+    """Execute a select query, retrying transient failures
+
+    Only use it for reads; a retried write might be applied twice.
+    """
+    return with_retry(query.execute, policy)
@@ -0,0 +1,28 @@
+import threading
+
+# Version-keyed caches only need a timer to pick up changes made outside the app
+VERSIONED_CACHE_TTL = 60 * 60
+
+class DataVersion:
+    """Monotonically increasing version of the stored data
+
+    Repositories bump it after every successful write. Caches include the
+    current version in their key, so they are invalidated exactly when the
+    data changes instead of on a short timer.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+
+    @property
+    def current(self) -> int:
+        return self._version
+
+    def bump(self) -> int:
+        with self._lock:
+            self._version += 1
+            return self._version
+
+
+# Create the shared instance
+data_version = DataVersion()
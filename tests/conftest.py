@@ -0,0 +1,79 @@
+"""Shared fixtures: a memory backend seeded with a small, irregular game history"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+import pytest
+from config.config import Config
+from core.enums import Color, Edition, GameFormat
+from core.models import Game
+from data.aggregates import game_aggregates
+from data.backends.memory import MemoryClient
+from data.player_directory import player_directory
+from data.repositories import GameRepository, PlayerRepository
+from visualization.ratings import rating_engine
+
+PLAYER_NAMES = ["Alice", "Bob", "Carol", "Dave", "Eve", "Frank"]
+START = datetime(2024, 3, 1, 20, 0)
+# Offsets that move a game to another calendar day in UTC
+OFFSETS = [None, timezone.utc, timezone(timedelta(hours=9)), timezone(timedelta(hours=-7, minutes=-30))]
+EDITIONS = [None, Edition.NONE, Edition.FOUNDATIONS, Edition.DUSKMOURN]
+
+
+def _colors(rng: random.Random) -> List[Color]:
+    return rng.sample(list(Color), rng.choice([0, 1, 1, 2, 2, 3]))
+
+
+def generate_games(player_ids: List[int], count: int = 400, seed: int = 7) -> List[Game]:
+    """Random games covering the edge cases of the statistics
+
+    Some games have no timestamp, many share one, timestamps carry offsets
+    and are set around midnight, and editions include both a missing
+    edition and the "None" edition.
+    """
+    rng = random.Random(seed)
+    games = []
+    played_at = START
+    for _ in range(count):
+        winner, loser = rng.sample(player_ids, 2)
+        winner_colors, loser_colors = _colors(rng), _colors(rng)
+        if not winner_colors and not loser_colors:
+            winner_colors = [rng.choice(list(Color))]
+        # Every other game shares the timestamp of the previous one
+        if rng.random() < 0.5:
+            played_at = START + timedelta(days=rng.randrange(60), hours=rng.choice([0, 3, 4]), minutes=rng.randrange(60))
+        offset = rng.choice(OFFSETS)
+        games.append(Game(
+            winner_id=winner,
+            loser_id=loser,
+            game_format=rng.choice([GameFormat.DRAFT, GameFormat.COMMANDER, GameFormat.SEALED]),
+            winner_colors=winner_colors,
+            loser_colors=loser_colors,
+            edition=rng.choice(EDITIONS),
+            played_at=None if rng.random() < 0.08 else (played_at.replace(tzinfo=offset) if offset else played_at),
+        ))
+    return games
+
+
+@pytest.fixture(scope="session")
+def seeded_games() -> List[Dict[str, Any]]:
+    """Seed a fresh memory backend once and return all stored game rows
+
+    A few games are updated and deleted after the insert, so the
+    incrementally maintained aggregates see every kind of write.
+    """
+    Config._db_client = MemoryClient()
+    player_directory.refresh()
+    game_aggregates.refresh()
+    rating_engine.reset()
+
+    player_ids = [PlayerRepository.add(name)["id"] for name in PLAYER_NAMES]
+    inserted = GameRepository.add_many(generate_games(player_ids)).inserted
+    # Load the aggregates before the writes below, so they are applied incrementally
+    game_aggregates.player_records()
+    for row in inserted[10:15]:
+        GameRepository.delete(row["id"])
+    for row in inserted[20:25]:
+        game = Game.from_dict(row)
+        game.winner_id, game.loser_id = game.loser_id, game.winner_id
+        GameRepository.update(row["id"], game)
+    return GameRepository.get_all()
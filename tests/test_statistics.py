@@ -0,0 +1,292 @@
+"""Vectorized statistics compared against simple row-by-row references"""
+from dataclasses import asdict
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pytest
+from visualization import ratings
+from visualization.data_provider import DataProvider
+from visualization.game_table import GameTable
+from visualization.ratings import INITIAL_RATING, K_FACTOR, RatingStream
+from visualization.stats_calculator import StatsCalculator, StatsFilter
+from conftest import PLAYER_NAMES
+
+FILTERS = [
+    StatsFilter(),
+    StatsFilter(edition_filter="None"),
+    StatsFilter(edition_filter="Foundations", format_filter="Draft"),
+    StatsFilter(format_filter="Commander"),
+    StatsFilter(start_date=date(2024, 3, 20)),
+    StatsFilter(end_date=date(2024, 3, 15), edition_filter="Duskmourn"),
+    StatsFilter(start_date=date(2024, 3, 5), end_date=date(2024, 3, 5)),
+    StatsFilter(start_date=date(2024, 4, 1), end_date=date(2024, 3, 1)),
+]
+
+Record = Tuple[int, int, int, float]
+
+
+class CubeDataProvider(DataProvider):
+    """Answers every statistic from the aggregate cube instead of the counters"""
+    def get_aggregates(self) -> None:
+        return None
+
+
+@pytest.fixture(params=["aggregates", "cube"])
+def calculator(request, seeded_games) -> StatsCalculator:
+    return StatsCalculator(DataProvider() if request.param == "aggregates" else CubeDataProvider())
+
+
+@pytest.fixture
+def names(seeded_games) -> Dict[int, str]:
+    provider = DataProvider()
+    return {
+        player_id: provider.get_player_by_id(player_id)
+        for game in seeded_games for player_id in (game["winner_id"], game["loser_id"])
+    }
+
+
+def wall_clock(game: Dict[str, Any]) -> Optional[datetime]:
+    """Local time of a game, ignoring its offset like the dashboard does"""
+    return datetime.fromisoformat(game["played_at"]).replace(tzinfo=None) if game["played_at"] else None
+
+
+def matches(game: Dict[str, Any], filters: StatsFilter) -> bool:
+    if filters.start_date or filters.end_date:
+        played_at = wall_clock(game)
+        if played_at is None:
+            return False
+        if filters.start_date and played_at.date() < filters.start_date:
+            return False
+        if filters.end_date and played_at.date() > filters.end_date:
+            return False
+    if filters.edition_filter != "All" and game["edition"] != filters.edition_filter:
+        return False
+    return filters.format_filter == "All" or game["format"] == filters.format_filter
+
+
+def record(wins: int, total: int) -> Record:
+    return wins, total - wins, total, round(wins / total * 100, 2)
+
+
+def count(results: List[Tuple[str, bool]]) -> Dict[str, Record]:
+    """Records per label from (label, won) pairs"""
+    totals: Dict[str, List[int]] = {}
+    for label, won in results:
+        entry = totals.setdefault(label, [0, 0])
+        entry[0] += won
+        entry[1] += 1
+    return {label: record(wins, total) for label, (wins, total) in totals.items()}
+
+
+def records(df: pd.DataFrame, label_column: str) -> Dict[str, Record]:
+    """Records of a win rate table, which must be sorted by win rate"""
+    assert df["Win Rate (%)"].is_monotonic_decreasing if not df.empty else True
+    return {
+        row[label_column]: (row["Wins"], row["Losses"], row["Total Games"], row["Win Rate (%)"])
+        for row in df.to_dict("records")
+    }
+
+
+def player_results(games: List[Dict[str, Any]], player_id: int, filters: StatsFilter):
+    """(game, won) of every filtered game of a player"""
+    return [
+        (game, game["winner_id"] == player_id)
+        for game in games
+        if player_id in (game["winner_id"], game["loser_id"]) and matches(game, filters)
+    ]
+
+
+def player_colors(game: Dict[str, Any], won: bool) -> List[str]:
+    return game["winner_colors"] if won else game["loser_colors"]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_player_win_rates(calculator, seeded_games, names, filters):
+    expected = count(
+        (names[game[column]], column == "winner_id")
+        for game in seeded_games if matches(game, filters)
+        for column in ("winner_id", "loser_id")
+    )
+    df = calculator.calculate_player_win_rates(**asdict(filters))
+    assert records(df, "Player") == expected
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("player", PLAYER_NAMES[:3] + ["Nobody"])
+def test_player_stats(calculator, seeded_games, names, filters, player):
+    player_id = DataProvider().get_player_id(player)
+    results = player_results(seeded_games, player_id, filters) if player_id else []
+    opponent = {True: "loser_id", False: "winner_id"}
+    expected = {
+        "overall": count((player, won) for _, won in results),
+        "matchups": count((names[game[opponent[won]]], won) for game, won in results),
+        "colors": count((", ".join(sorted(player_colors(game, won))) or "Colorless", won) for game, won in results),
+        "individual_colors": count(
+            (color, won) for game, won in results for color in player_colors(game, won) or ["Colorless"]
+        ),
+    }
+
+    stats = calculator.calculate_player_stats(player, filters)
+    assert records(stats.overall, "Player") == expected["overall"]
+    assert records(stats.matchups, "Opponent") == expected["matchups"]
+    assert records(stats.colors, "Colors") == expected["colors"]
+    assert records(stats.individual_colors, "Color") == expected["individual_colors"]
+
+    # The single-table methods agree with the combined one
+    assert records(calculator.calculate_player_matchups(player, **asdict(filters)), "Opponent") == expected["matchups"]
+    assert records(calculator.calculate_player_color_stats(player, **asdict(filters)), "Colors") == expected["colors"]
+    assert records(
+        calculator.calculate_player_individual_color_stats(player, **asdict(filters)), "Color"
+    ) == expected["individual_colors"]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_head_to_head(calculator, seeded_games, names, filters):
+    games = [game for game in seeded_games if matches(game, filters)]
+    players = sorted({names[game[column]] for game in games for column in ("winner_id", "loser_id")})
+    expected = pd.DataFrame(0, index=players, columns=players)
+    for game in games:
+        expected.loc[names[game["winner_id"]], names[game["loser_id"]]] += 1
+
+    df = calculator.calculate_head_to_head(**asdict(filters))
+    if not players:
+        assert df.empty
+    else:
+        pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("window_days", [1, 7, 30])
+def test_player_trend(calculator, seeded_games, filters, window_days):
+    for player in PLAYER_NAMES:
+        player_id = DataProvider().get_player_id(player)
+        days: Dict[date, List[int]] = {}
+        for game, won in player_results(seeded_games, player_id, filters):
+            if game["played_at"]:
+                day = days.setdefault(wall_clock(game).date(), [0, 0])
+                day[0] += won
+                day[1] += 1
+
+        df = calculator.calculate_player_trend(player, filters, window_days)
+        if not days:
+            assert df.empty
+            continue
+
+        # One row per calendar day between the player's first and last game
+        calendar = pd.date_range(min(days), max(days)).date
+        wins = np.array([days.get(day, [0, 0])[0] for day in calendar])
+        games = np.array([days.get(day, [0, 0])[1] for day in calendar])
+        rolling_wins = pd.Series(wins).rolling(window_days, min_periods=1).sum().to_numpy()
+        rolling_games = pd.Series(games).rolling(window_days, min_periods=1).sum().to_numpy()
+
+        assert list(df["Day"].dt.date) == list(calendar)
+        assert df["Games"].tolist() == games.tolist()
+        assert df["Wins"].tolist() == wins.tolist()
+        assert df["Losses"].tolist() == (games - wins).tolist()
+        np.testing.assert_allclose(df["Win Rate (%)"], (np.cumsum(wins) / np.cumsum(games) * 100).round(2))
+        with np.errstate(invalid="ignore"):
+            rolling = np.where(rolling_games > 0, rolling_wins / rolling_games * 100, np.nan).round(2)
+        np.testing.assert_allclose(df["Rolling Win Rate (%)"], rolling, equal_nan=True)
+
+
+def replay(games: List[Dict[str, Any]]):
+    """Elo ratings of games in (played_at, id) order, undated games first
+
+    Returns the final ratings, peaks and game counts, and the rating of each
+    player after their last game of every day.
+    """
+    ordered = sorted(games, key=lambda game: (game["played_at"] is not None, wall_clock(game) or datetime.min, game["id"]))
+    current: Dict[int, float] = {}
+    peaks: Dict[int, float] = {}
+    played: Dict[int, int] = {}
+    daily: Dict[Tuple[int, date], Tuple[datetime, float]] = {}
+    for game in ordered:
+        winner, loser = game["winner_id"], game["loser_id"]
+        winner_rating = current.get(winner, INITIAL_RATING)
+        loser_rating = current.get(loser, INITIAL_RATING)
+        delta = K_FACTOR * (1 - 1 / (1 + 10 ** ((loser_rating - winner_rating) / 400)))
+        current[winner], current[loser] = winner_rating + delta, loser_rating - delta
+        peaks[winner] = max(peaks.get(winner, INITIAL_RATING), current[winner])
+        peaks.setdefault(loser, INITIAL_RATING)
+        for player_id in (winner, loser):
+            played[player_id] = played.get(player_id, 0) + 1
+            if game["played_at"]:
+                daily[player_id, wall_clock(game).date()] = (wall_clock(game), current[player_id])
+    return current, peaks, played, daily
+
+
+@pytest.mark.parametrize("filters", [f for f in FILTERS if not (f.start_date or f.end_date)])
+def test_player_ratings(calculator, seeded_games, names, filters):
+    current, peaks, played, daily = replay([game for game in seeded_games if matches(game, filters)])
+
+    df = calculator.calculate_player_ratings(filters.edition_filter, filters.format_filter)
+    assert df["Rating"].is_monotonic_decreasing
+    assert {row["Player"]: (row["Rating"], row["Peak"], row["Games"]) for row in df.to_dict("records")} == {
+        names[player_id]: (round(rating, 1), round(peaks[player_id], 1), played[player_id])
+        for player_id, rating in current.items()
+    }
+
+    history = calculator.calculate_rating_history(filters.edition_filter, filters.format_filter)
+    assert history["Played At"].is_monotonic_increasing
+    assert sorted(zip(history["Played At"].tolist(), history["Player"], history["Rating"])) == sorted(
+        (played_at, names[player_id], np.round(rating, 1)) for (player_id, _), (played_at, rating) in daily.items()
+    )
+
+
+def _columns(table: GameTable) -> Dict[str, np.ndarray]:
+    return {column: getattr(table, column) for column in ("game_ids", "winner_ids", "loser_ids", "played_at")}
+
+
+def _assert_same_stream(stream: RatingStream, fresh: RatingStream) -> None:
+    assert stream.state == fresh.state
+    for actual, expected in zip(stream.history(), fresh.history()):
+        np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.fixture
+def checkpointed(monkeypatch):
+    # Checkpoints every few games, so changes resume from a checkpoint in the middle
+    monkeypatch.setattr(ratings, "CHECKPOINT_INTERVAL", 16)
+
+
+def _edited(columns: Dict[str, np.ndarray], position: int) -> Dict[str, np.ndarray]:
+    edited = dict(columns)
+    edited["winner_ids"], edited["loser_ids"] = columns["winner_ids"].copy(), columns["loser_ids"].copy()
+    edited["winner_ids"][position], edited["loser_ids"][position] = columns["loser_ids"][position], columns["winner_ids"][position]
+    return edited
+
+
+def _deleted(columns: Dict[str, np.ndarray], position: int) -> Dict[str, np.ndarray]:
+    return {column: np.delete(values, position) for column, values in columns.items()}
+
+
+@pytest.mark.parametrize("change", ["append", "edit", "delete", "backfill", "unchanged"])
+def test_incremental_rating_stream(seeded_games, checkpointed, change):
+    columns = _columns(GameTable.from_rows(seeded_games))
+    size = len(columns["game_ids"])
+    middle = size // 2
+
+    if change == "append":
+        before, after = {column: values[:middle] for column, values in columns.items()}, columns
+        replayed = size - middle
+    elif change == "edit":
+        before, after = columns, _edited(columns, middle)
+        replayed = size - middle // 16 * 16
+    elif change == "delete":
+        before, after = columns, _deleted(columns, middle)
+        replayed = size - 1 - middle // 16 * 16
+    elif change == "backfill":
+        before, after = _deleted(columns, middle), columns
+        replayed = size - middle // 16 * 16
+    else:
+        before, after = columns, columns
+        replayed = 0
+
+    stream = RatingStream()
+    stream.update(before)
+    assert stream.update(after) == replayed
+
+    fresh = RatingStream()
+    fresh.update(after)
+    _assert_same_stream(stream, fresh)
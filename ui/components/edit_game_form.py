@@ -1,23 +1,28 @@
 import streamlit as st
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
 from datetime import datetime
 from core.enums import GameFormat, Color, Edition
 from core.models import Game
-from data.repositories import GameRepository, PlayerRepository
+from data.repositories import GameRepository
+from data.player_directory import player_directory
 
-def render_edit_game_form(game_data: Dict[str, Any]) -> None:
-    """Render form for editing an existing game"""
+def render_edit_game_form(game_data: Dict[str, Any], on_close: Optional[Callable[[], None]] = None) -> None:
+    """Render form for editing an existing game
+
+    on_close is called when the form is closed by saving, deleting or cancelling.
+    """
+    def close() -> None:
+        st.session_state.pop(f"confirm_delete_{game_data['id']}", None)
+        if on_close:
+            on_close()
 
     # Get players for dropdowns
-    players = PlayerRepository.get_all()
-    player_map = {p["name"]: p["id"] for p in players}
+    player_map = player_directory.name_map()
     player_names = list(player_map.keys())
 
     # Get current values
-    current_winner = next(name for name, id in player_map.items()
-                        if id == game_data["winner_id"])
-    current_loser = next(name for name, id in player_map.items()
-                        if id == game_data["loser_id"])
+    current_winner = player_directory.get_name(game_data["winner_id"])
+    current_loser = player_directory.get_name(game_data["loser_id"])
 
     # Form inputs
     winner = st.selectbox(
@@ -82,16 +87,16 @@ def render_edit_game_form(game_data: Dict[str, Any]) -> None:
     delete_button = st.button("🗑️ Delete Game", key=f"delete_{game_data['id']}", type="secondary", help="Permanently delete this game")
 
     if cancel_button:
-        del st.session_state[f"editing_game_{game_data['id']}"]
-        st.rerun()
+        close()
+        # Nothing changed, so only the section showing the form needs to rerun
+        st.rerun(scope="fragment")
 
     if delete_button:
         if st.session_state.get(f"confirm_delete_{game_data['id']}", False):
             try:
                 GameRepository.delete(game_data["id"])
                 st.success("Game deleted successfully!")
-                del st.session_state[f"editing_game_{game_data['id']}"]
-                del st.session_state[f"confirm_delete_{game_data['id']}"]
+                close()
                 st.rerun()
             except Exception as e:
                 st.error(f"Failed to delete game: {e}")
@@ -121,19 +126,8 @@ def render_edit_game_form(game_data: Dict[str, Any]) -> None:
             # Update in database
             GameRepository.update(game_data["id"], game)
             st.success("Game updated successfully!")
-            del st.session_state[f"editing_game_{game_data['id']}"]
+            close()
             st.rerun()  # Refresh the page to show updated data
 
         except Exception as e:
             st.error(f"Failed to update game: {e}")
-
-def edit_game_modal(game_data: Dict[str, Any]) -> None:
-    """Show edit game modal"""
-    col1, col2 = st.columns([0.85, 0.15])
-    with col2:
-        if st.button("Edit", key=f"edit_button_{game_data['id']}"):
-            st.session_state[f"editing_game_{game_data['id']}"] = True
-
-    if st.session_state.get(f"editing_game_{game_data['id']}", False):
-        with st.expander("Edit Game", expanded=True):
-            render_edit_game_form(game_data)
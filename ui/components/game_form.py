@@ -2,16 +2,29 @@ import streamlit as st
 from typing import List, Dict
 from core.enums import GameFormat, Color, Edition
 from core.models import Game
-from data.repositories import GameRepository, PlayerRepository
+from data.repositories import GameRepository
+from data.player_directory import player_directory
+from .metrics_panel import metrics_fragment
 from datetime import datetime
 
+# Session key of the message shown after the rerun that follows a new game
+FLASH_KEY = "game_form_flash"
+
+@metrics_fragment
 def render_game_form() -> None:
-    """Render the game input form"""
+    """Render the game input form
+
+    Runs as a fragment, so filling in the form does not rerun the rest of
+    the page. Adding a game reruns the whole app to refresh every section.
+    """
     st.header("Add game result")
 
+    flash = st.session_state.pop(FLASH_KEY, None)
+    if flash:
+        st.success(flash)
+
     # Get players
-    players = PlayerRepository.get_all()
-    player_map = {p["name"]: p["id"] for p in players}
+    player_map = player_directory.name_map()
     player_names = sorted(list(player_map.keys()))  # Sort player names alphabetically
 
     if not player_names:
@@ -57,8 +70,9 @@ def render_game_form() -> None:
                 played_at=datetime.now()  # Set current date and time
             )
             GameRepository.add(game)
-            st.success(
-                f"Game result added: {winner} defeated {loser} in {game_format} format!"
-            )
         except Exception as e:
             st.error(f"Failed to add game: {e}")
+            return
+
+        st.session_state[FLASH_KEY] = f"Game result added: {winner} defeated {loser} in {game_format} format!"
+        st.rerun()
@@ -1,18 +1,19 @@
+import pandas as pd
 import streamlit as st
-from datetime import datetime, timedelta
-from data.repositories import GameRepository, PlayerRepository
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from data.repositories import GameRepository
+from data.paging import PAGE_SIZE
+from data.player_directory import player_directory
 from core.enums import Edition, GameFormat
-from .edit_game_form import edit_game_modal
-from typing import List, Dict, Any
+from .edit_game_form import render_edit_game_form
+from .metrics_panel import metrics_fragment, is_fragment_run
+from typing import List, Dict, Any, Optional
 
-@st.cache_data(ttl=60)  # Cache player data for 1 minute
-def get_cached_players() -> List[Dict[str, Any]]:
-    """Get cached list of players"""
-    try:
-        return PlayerRepository.get_all()
-    except Exception as e:
-        st.error(f"Failed to fetch players: {str(e)}")
-        return []
+# Upper bound of the "Show games" input. The games come from one limited request, which
+# the server caps at PAGE_SIZE rows, so a larger limit would silently show fewer games
+HISTORY_MAX_GAMES = PAGE_SIZE
+TABLE_GENERATION_KEY = "history_table_generation"
 
 def get_game_date(game):
     """Extract date from game's played_at field"""
@@ -26,13 +27,54 @@ def get_game_date(game):
         st.error(f"Error parsing date for game {game}: {str(e)}")
         return None
 
-def render_game_history() -> None:
-    """Render game history"""
+@dataclass(frozen=True)
+class HistoryQuery:
+    """Filter values of the history view"""
+    start_date: Optional[date]
+    end_date: Optional[date]
+    edition_filter: str = "All"
+    format_filter: str = "All"
+    player_filter: str = "All"
+    limit: int = 5
+
+    @classmethod
+    def from_session_state(cls) -> 'HistoryQuery':
+        """Filters the history widgets will report in this rerun, read before they render"""
+        today = datetime.now().date()
+        return cls(
+            start_date=st.session_state.get("history_start_date", today - timedelta(days=30)),
+            end_date=st.session_state.get("history_end_date", today),
+            edition_filter=st.session_state.get("history_edition_filter", "All"),
+            format_filter=st.session_state.get("history_format_filter", "All"),
+            player_filter=st.session_state.get("history_player_filter", "All"),
+            limit=st.session_state.get("history_limit", 5),
+        )
+
+    def fetch(self) -> List[Dict[str, Any]]:
+        """Get filtered games directly from database"""
+        player_id = player_directory.get_id(self.player_filter) if self.player_filter != "All" else None
+        return GameRepository.get_filtered_games(
+            start_date=self.start_date,
+            end_date=self.end_date,
+            edition_filter=self.edition_filter,
+            format_filter=self.format_filter,
+            player_id=player_id,
+            limit=self.limit
+        )
+
+@metrics_fragment
+def render_game_history(prefetched: Optional[Dict[HistoryQuery, List[Dict[str, Any]]]] = None) -> None:
+    """Render game history
+
+    Runs as a fragment, so changing its filters or selecting a game only
+    reruns this section. Games loaded ahead of time for the same filters are
+    reused on the full run they were loaded for instead of being queried
+    again. A fragment rerun gets the arguments of the last full run, so it
+    always queries fresh games.
+    """
     st.header("Game History")
 
-    # Get cached player data
-    players = get_cached_players()
-    player_map = {p["name"]: p["id"] for p in players}
+    player_map = player_directory.name_map()
 
     # Filter and display options
     col1, col2, col3, col4, col5, col6 = st.columns([1, 1, 1, 1, 1, 0.7])
@@ -80,22 +122,17 @@ def render_game_history() -> None:
         display_limit = st.number_input(
             "Show games",
             min_value=1,
-            max_value=100,  # Reasonable maximum
+            max_value=HISTORY_MAX_GAMES,
             value=5,  # Default to 5 games
             step=5,
             key="history_limit"
         )
 
-    # Get filtered games directly from database
-    player_id = player_map[player_filter] if player_filter != "All" else None
-    filtered_games = GameRepository.get_filtered_games(
-        start_date=start_date,
-        end_date=end_date,
-        edition_filter=edition_filter,
-        format_filter=format_filter,
-        player_id=player_id,
-        limit=display_limit
-    )
+    query = HistoryQuery(start_date, end_date, edition_filter, format_filter, player_filter, display_limit)
+    if prefetched and query in prefetched and not is_fragment_run():
+        filtered_games = prefetched[query]
+    else:
+        filtered_games = query.fetch()
 
     if not filtered_games:
         st.info("No games found matching the selected filters.")
@@ -103,37 +140,50 @@ def render_game_history() -> None:
 
     # Display games
     st.caption(f"Showing {len(filtered_games)} games")
+    render_history_table(filtered_games)
+
+def _format_played_at(game: Dict[str, Any]) -> str:
+    if not game.get("played_at"):
+        return ""
+    try:
+        played_at = datetime.fromisoformat(game["played_at"]) if isinstance(game["played_at"], str) else game["played_at"]
+        return played_at.strftime('%Y-%m-%d %H:%M')
+    except (ValueError, AttributeError) as e:
+        st.error(f"Error parsing date: {e}")
+        return ""
+
+def _history_frame(games: List[Dict[str, Any]]) -> pd.DataFrame:
+    """One row per game"""
+    return pd.DataFrame({
+        "Played": [_format_played_at(game) for game in games],
+        "Winner": [player_directory.get_name(game["winner_id"]) for game in games],
+        "Winner Colors": [", ".join(game.get("winner_colors") or []) for game in games],
+        "Loser": [player_directory.get_name(game["loser_id"]) for game in games],
+        "Loser Colors": [", ".join(game.get("loser_colors") or []) for game in games],
+        "Format": [game["format"] for game in games],
+        "Edition": [game.get("edition") or "" for game in games],
+    })
+
+def _close_edit_form() -> None:
+    # A selection cannot be cleared through session state, so start a new table instead
+    st.session_state[TABLE_GENERATION_KEY] = st.session_state.get(TABLE_GENERATION_KEY, 0) + 1
+
+def render_history_table(games: List[Dict[str, Any]]) -> None:
+    """Render games as one virtualized table and the edit form of the selected game
+
+    The table is a single element however many games it shows; selecting a
+    row reruns only the history fragment.
+    """
+    event = st.dataframe(
+        _history_frame(games),
+        key=f"history_table_{st.session_state.get(TABLE_GENERATION_KEY, 0)}",
+        on_select="rerun",
+        selection_mode="single-row",
+        hide_index=True,
+        use_container_width=True,
+    )
 
-    for game in filtered_games:
-        # Create columns for game info and edit button
-        col1, col2 = st.columns([0.85, 0.15])
-
-        with col1:
-            winner_name = PlayerRepository.get_by_id(game["winner_id"])
-            loser_name = PlayerRepository.get_by_id(game["loser_id"])
-
-            # Handle date display
-            played_at_str = ""
-            if game.get("played_at"):
-                try:
-                    if isinstance(game["played_at"], str):
-                        played_at = datetime.fromisoformat(game["played_at"])
-                    else:
-                        played_at = game["played_at"]
-                    played_at_str = f" on {played_at.strftime('%Y-%m-%d %H:%M')}"
-                except (ValueError, AttributeError) as e:
-                    st.error(f"Error parsing date: {e}")
-
-            # Display game info with colors
-            winner_colors = ", ".join(game.get("winner_colors", []))
-            loser_colors = ", ".join(game.get("loser_colors", []))
-
-            game_info = (
-                f"{winner_name} ({winner_colors}) defeated "
-                f"{loser_name} ({loser_colors}) in {game['format']} format{played_at_str}"
-            )
-
-            st.write(game_info)
-
-        with col2:
-            edit_game_modal(game)
+    selected_rows = event.selection.rows
+    if selected_rows and selected_rows[0] < len(games):
+        with st.expander("Edit Game", expanded=True):
+            render_edit_game_form(games[selected_rows[0]], on_close=_close_edit_form)
@@ -0,0 +1,79 @@
+import functools
+import time
+import pandas as pd
+import streamlit as st
+from dataclasses import asdict
+from typing import Callable
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from config.config import config
+
+def _begin_run() -> None:
+    config.metrics.begin_run()
+    st.session_state["query_metrics_started"] = time.perf_counter()
+
+def is_fragment_run() -> bool:
+    """Whether this script run only reruns fragments instead of the whole app"""
+    ctx = get_script_run_ctx()
+    return bool(ctx and ctx.script_requests and ctx.script_requests.fragment_id_queue)
+
+def render_metrics_toggle() -> bool:
+    """Sidebar switch for query metrics; call before any data is loaded"""
+    enabled = st.sidebar.toggle(
+        "Query metrics",
+        key="show_query_metrics",
+        help="Record every repository and data provider call of this rerun"
+    )
+    config.metrics.set_enabled(enabled)
+    _begin_run()
+    return enabled
+
+def _render_metrics(rerun: str, key: str) -> None:
+    metrics = config.metrics.current_run()
+    elapsed = time.perf_counter() - st.session_state.get("query_metrics_started", time.perf_counter())
+    st.subheader("Query metrics")
+    # Nested and concurrent calls overlap, so their times do not add up to the rerun time
+    st.caption(f"{len(metrics)} calls in {rerun} of {elapsed * 1000:.0f} ms")
+    if not metrics:
+        return
+
+    st.dataframe(
+        pd.DataFrame(config.metrics.summarize(metrics)),
+        hide_index=True,
+        use_container_width=True
+    )
+    with st.expander("Individual calls"):
+        calls = pd.DataFrame([asdict(metric) for metric in metrics])
+        calls["ms"] = (calls.pop("seconds") * 1000).round(2)
+        st.dataframe(calls, hide_index=True, use_container_width=True)
+
+    if st.button("Write to log", key=key):
+        for metric in metrics:
+            config.metrics.log(metric)
+        st.success(f"Logged {len(metrics)} calls")
+
+def render_metrics_panel() -> None:
+    """Per-call breakdown of the current rerun; call after everything else has rendered"""
+    if not st.session_state.get("show_query_metrics"):
+        return
+    with st.sidebar:
+        _render_metrics("a rerun", "log_query_metrics")
+
+def metrics_fragment(fn: Callable) -> Callable:
+    """st.fragment that records and shows its own query metrics when it reruns alone
+
+    A fragment rerun skips the rest of the script, including the sidebar
+    panel, which fragments cannot write to. So each fragment rerun starts a
+    new metrics run and shows the breakdown below the fragment instead.
+    """
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        if not is_fragment_run():
+            return fn(*args, **kwargs)
+        _begin_run()
+        result = fn(*args, **kwargs)
+        if st.session_state.get("show_query_metrics"):
+            # Expanders cannot be nested, and the breakdown already uses one
+            with st.container(border=True):
+                _render_metrics("a rerun of this section", f"log_query_metrics_{fn.__name__}")
+        return result
+    return st.fragment(run)
@@ -0,0 +1,44 @@
+"""Concurrent loading of the data one dashboard rerun needs"""
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from data.player_directory import player_directory
+from visualization import DataProvider
+from .components.history_view import HistoryQuery
+
+
+@dataclass
+class DashboardData:
+    """Data loaded ahead of rendering"""
+    players: List[Dict[str, Any]]
+    history: Dict[HistoryQuery, List[Dict[str, Any]]]
+
+
+async def _gather(*loaders: Callable[[], Any]) -> List[Any]:
+    """Run blocking loaders on worker threads and wait for all of them"""
+    # Worker threads need the script context to use Streamlit caches and elements
+    ctx = get_script_run_ctx()
+
+    def run(loader: Callable[[], Any]) -> Any:
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return loader()
+
+    return await asyncio.gather(*(asyncio.to_thread(run, loader) for loader in loaders))
+
+
+def load_dashboard_data(data_provider: DataProvider) -> DashboardData:
+    """Issue all independent queries of a rerun concurrently
+
+    Page latency becomes that of the slowest query instead of the sum of all
+    of them. Stats data is only loaded to warm the caches the stats sections
+    read from; building the game table also loads the win/loss aggregates.
+    """
+    history_query = HistoryQuery.from_session_state()
+    players, history_games, _ = asyncio.run(_gather(
+        player_directory.get_all,
+        history_query.fetch,
+        data_provider.get_game_table,
+    ))
+    return DashboardData(players=players, history={history_query: history_games})
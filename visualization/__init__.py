@@ -1,6 +1,6 @@
 """Data visualization package"""
 from .data_provider import DataProvider
-from .stats_calculator import StatsCalculator
+from .stats_calculator import StatsCalculator, StatsFilter, PlayerStats
 from .visualizer import DataVisualizer
 
-__all__ = ['DataProvider', 'StatsCalculator', 'DataVisualizer']
+__all__ = ['DataProvider', 'StatsCalculator', 'StatsFilter', 'PlayerStats', 'DataVisualizer']
@@ -0,0 +1,212 @@
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+import numpy as np
+from config.config import config
+from core.enums import COLOR_COMBINATIONS
+from .game_table import (
+    GameTable, EDITION_CODES, FORMAT_CODES, MISSING_TIMESTAMP, UNKNOWN_CODE,
+    _SECONDS_PER_DAY, _day_number,
+)
+
+# Edition codes start at UNKNOWN_CODE, shift them to be non-negative for key packing
+_CODE_OFFSET = -UNKNOWN_CODE
+_EDITION_SPAN = len(EDITION_CODES) + _CODE_OFFSET
+_FORMAT_SPAN = len(FORMAT_CODES) + _CODE_OFFSET
+# Filter code of the games counted once more under "All" editions and formats
+_ALL_FILTERS = _EDITION_SPAN * _FORMAT_SPAN
+_FILTER_SPAN = _ALL_FILTERS + 1
+
+
+def _bincount(values: np.ndarray, weights: np.ndarray, size: int) -> np.ndarray:
+    """Sum the integer weights per value"""
+    return np.bincount(values, weights=weights, minlength=size).astype(np.int64)
+
+
+def _smallest_int(max_value: int):
+    """Integer dtype holding values up to max_value"""
+    return np.int32 if max_value < np.iinfo(np.int32).max else np.int64
+
+
+class _RangeSums:
+    """Counts per (key, day) stored as running totals
+
+    Entries are sorted by key and day, so the sum over a range of days of
+    one key is the difference of two running totals, found with two binary
+    searches no matter how many days the range covers.
+    """
+    def __init__(self, keys: np.ndarray, days: np.ndarray, day_span: int, weights: Dict[str, Optional[np.ndarray]]):
+        self.keys, key_index = np.unique(keys, return_inverse=True)
+        self.day_span = day_span
+        positions, entry_index = np.unique(key_index.reshape(-1) * day_span + days, return_inverse=True)
+        self.positions = positions.astype(_smallest_int(len(self.keys) * day_span))
+        entry_index = entry_index.reshape(-1)
+        # Running totals with a leading zero, totals[i] is the sum of the first i entries
+        total_type = _smallest_int(len(keys))
+        self.totals = {
+            name: np.concatenate([
+                np.zeros(1, dtype=total_type),
+                np.cumsum(np.bincount(entry_index, weights=values, minlength=len(positions)), dtype=total_type),
+            ])
+            for name, values in weights.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.positions.nbytes + sum(totals.nbytes for totals in self.totals.values())
+
+    def sums(self, selected: np.ndarray, day_range: Optional[Tuple[int, int]]) -> Dict[str, np.ndarray]:
+        """Sums over the day range (inclusive) of the keys at the selected indices"""
+        if day_range is None:
+            return {name: np.zeros(len(selected), dtype=np.int64) for name in self.totals}
+        # Search with the dtype of the positions, mixed dtypes would copy them on every call
+        base = (selected * self.day_span).astype(self.positions.dtype)
+        lo = np.searchsorted(self.positions, base + day_range[0], side="left")
+        hi = np.searchsorted(self.positions, base + day_range[1], side="right")
+        return {name: totals[hi].astype(np.int64) - totals[lo] for name, totals in self.totals.items()}
+
+
+class AggregateCube:
+    """Daily game counts of two marginals, as running totals
+
+    - pairs: wins of a winner over a loser per edition and format
+    - colors: wins and games of a player per edition, format and color combination
+
+    Every statistic sums the distinct keys matching its filters over the
+    requested days. That costs two lookups per key, so it depends on the
+    number of players, editions and formats but not on the length of the
+    history. Games are counted once more under "All" editions and formats,
+    so the unfiltered view only sums one key per player, pair or color
+    combination. Day 0 holds the undated games, real days start at 1.
+    """
+    _built: 'weakref.WeakKeyDictionary[GameTable, AggregateCube]' = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
+    def __init__(self, table: GameTable):
+        self.player_ids = table.player_ids
+        players = max(table.player_count, 1)
+
+        dated = table.played_at != MISSING_TIMESTAMP
+        self.first_day = int(table.played_at[dated].min() // _SECONDS_PER_DAY) if dated.any() else 0
+        days = np.where(dated, table.played_at // _SECONDS_PER_DAY - self.first_day + 1, 0)
+        self.day_span = int(days.max()) + 1 if len(days) else 1
+
+        filters = (table.edition_codes.astype(np.int64) + _CODE_OFFSET) * _FORMAT_SPAN + table.format_codes + _CODE_OFFSET
+        filters = np.concatenate([filters, np.full(len(table), _ALL_FILTERS)])
+        days = np.concatenate([days] * 2)
+        winners = np.concatenate([table.winner_idx] * 2).astype(np.int64)
+        losers = np.concatenate([table.loser_idx] * 2).astype(np.int64)
+        winner_colors = np.concatenate([table.winner_colors] * 2)
+        loser_colors = np.concatenate([table.loser_colors] * 2)
+
+        self.pairs = _RangeSums((filters * players + winners) * players + losers, days, self.day_span, {"wins": None})
+        self.pair_filters = (self.pairs.keys // (players * players)).astype(np.int16)
+        self.pair_winners = (self.pairs.keys // players % players).astype(np.int32)
+        self.pair_losers = (self.pairs.keys % players).astype(np.int32)
+
+        # Player-major keys, so the color keys of one player are contiguous
+        player_filters = np.concatenate([winners, losers]) * _FILTER_SPAN + np.concatenate([filters] * 2)
+        color_keys = player_filters * COLOR_COMBINATIONS + np.concatenate([winner_colors, loser_colors])
+        won = np.repeat(np.array([1, 0], dtype=np.int64), len(winners))
+        self.colors = _RangeSums(color_keys, np.concatenate([days] * 2), self.day_span, {"wins": won, "games": None})
+        self.color_players = (self.colors.keys // (_FILTER_SPAN * COLOR_COMBINATIONS)).astype(np.int32)
+        self.color_filters = (self.colors.keys // COLOR_COMBINATIONS % _FILTER_SPAN).astype(np.int16)
+        self.color_masks = (self.colors.keys % COLOR_COMBINATIONS).astype(np.uint8)
+
+    @classmethod
+    def of(cls, table: GameTable) -> 'AggregateCube':
+        """Cube of a game table, built on first use and kept as long as the table"""
+        with cls._lock:
+            cube = cls._built.get(table)
+            if cube is None:
+                config.metrics.cache_miss()
+                cube = cls._built[table] = cls(table)
+            return cube
+
+    def __len__(self) -> int:
+        return len(self.pairs) + len(self.colors)
+
+    @property
+    def nbytes(self) -> int:
+        columns = (self.pair_filters, self.pair_winners, self.pair_losers, self.color_players, self.color_filters, self.color_masks)
+        return self.pairs.nbytes + self.colors.nbytes + sum(column.nbytes for column in columns)
+
+    @property
+    def player_count(self) -> int:
+        return len(self.player_ids)
+
+    def player_index(self, player_id: int) -> Optional[int]:
+        """Dense index of a player, or None if the player has no games"""
+        idx = int(np.searchsorted(self.player_ids, player_id))
+        if idx < len(self.player_ids) and self.player_ids[idx] == player_id:
+            return idx
+        return None
+
+    def _day_range(self, start_date=None, end_date=None) -> Optional[Tuple[int, int]]:
+        """Cube days between both dates (inclusive), or None if no day matches"""
+        first, last = 0, self.day_span - 1
+        if start_date or end_date:
+            # Undated games never match a date filter
+            first = 1
+        if start_date:
+            first = max(first, _day_number(start_date) - self.first_day + 1)
+        if end_date:
+            last = min(last, _day_number(end_date) - self.first_day + 1)
+        return (first, last) if first <= last else None
+
+    @staticmethod
+    def _filter_mask(filters: np.ndarray, edition_filter: str, format_filter: str) -> np.ndarray:
+        if edition_filter == "All" and format_filter == "All":
+            return filters == _ALL_FILTERS
+        mask = filters != _ALL_FILTERS
+        if edition_filter != "All":
+            mask &= filters // _FORMAT_SPAN == EDITION_CODES.get(edition_filter, UNKNOWN_CODE) + _CODE_OFFSET
+        if format_filter != "All":
+            mask &= filters % _FORMAT_SPAN == FORMAT_CODES.get(format_filter, UNKNOWN_CODE) + _CODE_OFFSET
+        return mask
+
+    def player_records(self, start_date=None, end_date=None, edition_filter="All", format_filter="All") -> Tuple[np.ndarray, np.ndarray]:
+        """Wins and games of every player, indexed by dense player index"""
+        selected = np.flatnonzero(self._filter_mask(self.color_filters, edition_filter, format_filter))
+        sums = self.colors.sums(selected, self._day_range(start_date, end_date))
+        players = self.color_players[selected]
+        return (
+            _bincount(players, sums["wins"], self.player_count),
+            _bincount(players, sums["games"], self.player_count),
+        )
+
+    def head_to_head(self, start_date=None, end_date=None, edition_filter="All", format_filter="All") -> np.ndarray:
+        """Wins of every player (rows) against every opponent (columns)"""
+        size = self.player_count
+        selected = np.flatnonzero(self._filter_mask(self.pair_filters, edition_filter, format_filter))
+        wins = self.pairs.sums(selected, self._day_range(start_date, end_date))["wins"]
+        # Flattened 2D bincount over all (winner, loser) pairs at once
+        pairs = self.pair_winners[selected].astype(np.int64) * size + self.pair_losers[selected]
+        return _bincount(pairs, wins, size * size).reshape(size, size)
+
+    def matchups(self, player_idx: int, start_date=None, end_date=None, edition_filter="All", format_filter="All") -> Tuple[np.ndarray, np.ndarray]:
+        """Wins and games of a player against every opponent, indexed by dense player index"""
+        involved = (self.pair_winners == player_idx) | (self.pair_losers == player_idx)
+        selected = np.flatnonzero(involved & self._filter_mask(self.pair_filters, edition_filter, format_filter))
+        counts = self.pairs.sums(selected, self._day_range(start_date, end_date))["wins"]
+        won = self.pair_winners[selected] == player_idx
+        opponents = np.where(won, self.pair_losers[selected], self.pair_winners[selected])
+        return (
+            _bincount(opponents, counts * won, self.player_count),
+            _bincount(opponents, counts, self.player_count),
+        )
+
+    def color_combinations(self, player_idx: int, start_date=None, end_date=None, edition_filter="All", format_filter="All") -> Tuple[np.ndarray, np.ndarray]:
+        """Wins and games of a player per color combination, indexed by color mask"""
+        lo, hi = np.searchsorted(self.color_players, [player_idx, player_idx + 1])
+        mask = self._filter_mask(self.color_filters[lo:hi], edition_filter, format_filter)
+        selected = lo + np.flatnonzero(mask)
+        sums = self.colors.sums(selected, self._day_range(start_date, end_date))
+        masks = self.color_masks[selected]
+        return (
+            _bincount(masks, sums["wins"], COLOR_COMBINATIONS),
+            _bincount(masks, sums["games"], COLOR_COMBINATIONS),
+        )
@@ -1,37 +1,100 @@
 from typing import List, Dict, Any, Optional
 import streamlit as st
 from config.config import config
+from data.player_directory import player_directory
+from data.aggregates import game_aggregates, GameAggregates
+from data.backends.postgrest import or_filter
+from data.repositories import GameRepository
+from data.retry import execute_read
+from data.versioning import data_version, VERSIONED_CACHE_TTL
+from .game_table import GameTable
+from .rollup import DailyRollup
+from .cube import AggregateCube
 
 class DataProvider:
-    """Provides data for visualization"""
+    """Provides data for visualization
 
-    @st.cache_data(ttl=60)  # Cache for 1 minute
-    def get_games(_self) -> List[Dict[str, Any]]:
+    Cached loaders take the current data version as an argument, so every
+    write through the repositories invalidates them immediately.
+    """
+
+    @config.metrics.instrument("DataProvider.get_games", cached=True)
+    def get_games(self) -> List[Dict[str, Any]]:
         """Get all games"""
-        return config.db.table("games").select("*").execute().data
+        return self._get_games(data_version.current)
+
+    @st.cache_data(ttl=VERSIONED_CACHE_TTL, max_entries=2)
+    def _get_games(_self, version: int) -> List[Dict[str, Any]]:
+        config.metrics.cache_miss()
+        return [game for page in GameRepository.iter_pages() for game in page]
+
+    @config.metrics.instrument("DataProvider.get_game_table", cached=True)
+    def get_game_table(self) -> GameTable:
+        """Get all games as a columnar table"""
+        return self._get_game_table(data_version.current)
+
+    @st.cache_resource(ttl=VERSIONED_CACHE_TTL, max_entries=2)  # Built once per data version, shared read-only
+    def _get_game_table(_self, version: int) -> GameTable:
+        config.metrics.cache_miss()
+        # Fold pages into columns as they arrive instead of materializing all rows,
+        # and into the aggregates when they need loading, so one scan serves both
+        return GameTable.from_pages(game_aggregates.scan(GameRepository.iter_pages()))
+
+    @config.metrics.instrument("DataProvider.get_aggregate_cube", cached=True)
+    def get_aggregate_cube(self) -> AggregateCube:
+        """Get game counts per day, edition, format, player, opponent, colors and result"""
+        # Built once per game table, so it follows the table's data version
+        return AggregateCube.of(self.get_game_table())
+
+    @config.metrics.instrument("DataProvider.get_daily_rollup", cached=True)
+    def get_daily_rollup(self) -> DailyRollup:
+        """Get win and loss counts per day, player, edition and format"""
+        # Built once per game table, so it follows the table's data version
+        return DailyRollup.of(self.get_game_table())
 
-    @st.cache_data(ttl=60)  # Cache for 1 minute
-    def get_recent_games(_self, limit: int = 100) -> List[Dict[str, Any]]:
+    @config.metrics.instrument("DataProvider.get_recent_games", cached=True)
+    def get_recent_games(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent games with limit"""
-        query = config.db.table("games").select("*").order("played_at", desc=True)
+        return self._get_recent_games(limit, data_version.current)
+
+    @st.cache_data(ttl=VERSIONED_CACHE_TTL, max_entries=16)
+    def _get_recent_games(_self, limit: Optional[int], version: int) -> List[Dict[str, Any]]:
+        config.metrics.cache_miss()
+        # Newest first with undated games on top, ties broken by id
+        query = config.db.table("games").select("*").order("played_at.desc,id.desc")
         if limit is not None:
             query = query.limit(limit)
-        return query.execute().data
+        return execute_read(query).data
 
-    @st.cache_data(ttl=60)  # Cache for 1 minute
-    def get_players(_self) -> List[Dict[str, Any]]:
+    @config.metrics.instrument("DataProvider.get_players")
+    def get_players(self) -> List[Dict[str, Any]]:
         """Get all players"""
-        return config.db.table("players").select("*").execute().data
+        return player_directory.get_all()
 
-    @st.cache_data(ttl=60)  # Cache for 1 minute
-    def get_player_by_id(_self, player_id: int) -> Optional[str]:
+    @config.metrics.instrument("DataProvider.get_player_by_id")
+    def get_player_by_id(self, player_id: int) -> Optional[str]:
         """Get player name by ID"""
-        response = config.db.table("players").select("name").eq("id", player_id).limit(1).execute()
-        return response.data[0]["name"] if response.data else None
+        return player_directory.get_name(player_id)
+
+    @config.metrics.instrument("DataProvider.get_player_id")
+    def get_player_id(self, name: str) -> Optional[int]:
+        """Get player ID by name"""
+        return player_directory.get_id(name)
+
+    def get_aggregates(self) -> Optional[GameAggregates]:
+        """Incrementally maintained counters, or None if this source has none"""
+        return game_aggregates
 
     @staticmethod
-    @st.cache_data(ttl=60)  # Cache for 1 minute
+    @config.metrics.instrument("DataProvider.get_player_games", cached=True)
     def get_player_games(player_id: int) -> List[Dict[str, Any]]:
-        return config.db.table("games").select("*").or_(
+        return DataProvider._get_player_games(player_id, data_version.current)
+
+    @staticmethod
+    @st.cache_data(ttl=VERSIONED_CACHE_TTL, max_entries=64)
+    def _get_player_games(player_id: int, version: int) -> List[Dict[str, Any]]:
+        config.metrics.cache_miss()
+        return execute_read(or_filter(
+            config.db.table("games").select("*"),
             f"winner_id.eq.{player_id},loser_id.eq.{player_id}"
-        ).execute().data
+        )).data
@@ -0,0 +1,175 @@
+import warnings
+from typing import Any, Dict, Iterable, List, Optional
+from datetime import date, datetime, timedelta
+import numpy as np
+from core.enums import GameFormat, Color, Edition
+
+# Integer codes for the enum-valued columns
+FORMAT_CODES: Dict[str, int] = {game_format.value: code for code, game_format in enumerate(GameFormat)}
+EDITION_CODES: Dict[str, int] = {edition.value: code for code, edition in enumerate(Edition)}
+COLOR_BITS: Dict[str, int] = {color.value: color.bit for color in Color}
+NO_EDITION = -1
+UNKNOWN_CODE = -2
+
+# Sentinel for games without a played_at timestamp
+MISSING_TIMESTAMP = np.iinfo(np.int64).min
+
+_EPOCH = datetime(1970, 1, 1)
+_SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def _wall_clock_seconds(played_at: Optional[str]) -> int:
+    """Seconds since epoch of the wall-clock time stored in played_at"""
+    if not played_at:
+        return MISSING_TIMESTAMP
+    # Drop the offset so that calendar dates match datetime.fromisoformat(...).date()
+    moment = datetime.fromisoformat(played_at).replace(tzinfo=None)
+    return (moment - _EPOCH) // timedelta(seconds=1)
+
+
+def _wall_clock_column(values: List[Optional[str]]) -> np.ndarray:
+    """_wall_clock_seconds of a whole column, parsed by numpy in one pass"""
+    try:
+        with warnings.catch_warnings():
+            # numpy would convert remaining offsets to UTC; fall back instead
+            warnings.simplefilter("error", DeprecationWarning)
+            # Keep date and time to the second, dropping fractions and the offset
+            moments = np.array([value[:19] if value else "NaT" for value in values], dtype="datetime64[s]")
+    except (ValueError, DeprecationWarning):
+        return np.fromiter((_wall_clock_seconds(value) for value in values), dtype=np.int64, count=len(values))
+    # NaT is stored as the smallest int64, which is MISSING_TIMESTAMP
+    return moments.astype(np.int64)
+
+
+def _day_start_seconds(day: date) -> int:
+    """Seconds since epoch at midnight of the given day"""
+    return (day - _EPOCH.date()).days * _SECONDS_PER_DAY
+
+
+def _day_number(day: date) -> int:
+    """Days since epoch of the given day"""
+    return _day_start_seconds(day) // _SECONDS_PER_DAY
+
+
+def mask_colors(mask: int) -> List[str]:
+    """Decode a color bitmask into color names"""
+    return [color.value for color in Color.from_mask(mask)]
+
+
+class GameTable:
+    """Column-oriented, read-only view of all games for vectorized statistics"""
+    def __init__(
+        self,
+        game_ids: np.ndarray,
+        winner_ids: np.ndarray,
+        loser_ids: np.ndarray,
+        format_codes: np.ndarray,
+        edition_codes: np.ndarray,
+        played_at: np.ndarray,
+        winner_colors: np.ndarray,
+        loser_colors: np.ndarray,
+    ):
+        # Keep games ordered by (played_at, id) so date ranges are contiguous slices
+        order = np.lexsort((game_ids, played_at))
+        self.game_ids = game_ids[order]
+        self.winner_ids = winner_ids[order]
+        self.loser_ids = loser_ids[order]
+        self.format_codes = format_codes[order]
+        self.edition_codes = edition_codes[order]
+        self.played_at = played_at[order]
+        self.winner_colors = winner_colors[order]
+        self.loser_colors = loser_colors[order]
+        self._index_players()
+
+    def _index_players(self) -> None:
+        # Dense player indices so that counts can be aggregated with bincount
+        self.player_ids = np.unique(np.concatenate([self.winner_ids, self.loser_ids]))
+        self.winner_idx = np.searchsorted(self.player_ids, self.winner_ids)
+        self.loser_idx = np.searchsorted(self.player_ids, self.loser_ids)
+
+    @staticmethod
+    def _decode_rows(rows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Decode game rows as returned by the database into column arrays"""
+        return dict(
+            game_ids=np.fromiter((row.get("id") or 0 for row in rows), dtype=np.int64, count=len(rows)),
+            winner_ids=np.fromiter((row["winner_id"] for row in rows), dtype=np.int64, count=len(rows)),
+            loser_ids=np.fromiter((row["loser_id"] for row in rows), dtype=np.int64, count=len(rows)),
+            format_codes=np.fromiter(
+                (FORMAT_CODES.get(row["format"], UNKNOWN_CODE) for row in rows),
+                dtype=np.int8, count=len(rows)
+            ),
+            edition_codes=np.fromiter(
+                (EDITION_CODES.get(row["edition"], UNKNOWN_CODE) if row.get("edition") else NO_EDITION for row in rows),
+                dtype=np.int8, count=len(rows)
+            ),
+            played_at=_wall_clock_column([row.get("played_at") for row in rows]),
+            winner_colors=np.fromiter(
+                (Color.to_mask(row.get("winner_colors")) for row in rows),
+                dtype=np.uint8, count=len(rows)
+            ),
+            loser_colors=np.fromiter(
+                (Color.to_mask(row.get("loser_colors")) for row in rows),
+                dtype=np.uint8, count=len(rows)
+            ),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> 'GameTable':
+        """Build the table from game rows as returned by the database"""
+        return cls(**cls._decode_rows(rows))
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[List[Dict[str, Any]]]) -> 'GameTable':
+        """Build the table from a stream of row pages
+
+        Each page is decoded into column arrays as it arrives and then dropped,
+        so the row dicts of the whole history are never held at once.
+        """
+        chunks = [cls._decode_rows(page) for page in pages]
+        if not chunks:
+            return cls.from_rows([])
+        return cls(**{
+            column: np.concatenate([chunk[column] for chunk in chunks])
+            for column in chunks[0]
+        })
+
+    @classmethod
+    def from_sorted_columns(cls, **columns: np.ndarray) -> 'GameTable':
+        """Build the table from columns already in (played_at, id) order
+
+        The arrays are used as they are, e.g. memory-mapped snapshot columns,
+        so only the player indices are computed.
+        """
+        table = object.__new__(cls)
+        for column, values in columns.items():
+            setattr(table, column, values)
+        table._index_players()
+        return table
+
+    def __len__(self) -> int:
+        return len(self.game_ids)
+
+    @property
+    def player_count(self) -> int:
+        return len(self.player_ids)
+
+    def player_index(self, player_id: int) -> Optional[int]:
+        """Dense index of a player, or None if the player has no games"""
+        idx = int(np.searchsorted(self.player_ids, player_id))
+        if idx < len(self.player_ids) and self.player_ids[idx] == player_id:
+            return idx
+        return None
+
+    def filter_mask(self, edition_filter="All", format_filter="All") -> np.ndarray:
+        """Boolean mask of the games matching the edition and format filters"""
+        mask = np.ones(len(self), dtype=bool)
+
+        # Apply edition filter if specified
+        if edition_filter != "All":
+            mask &= self.edition_codes == EDITION_CODES.get(edition_filter, UNKNOWN_CODE)
+
+        # Apply format filter if specified
+        if format_filter != "All":
+            mask &= self.format_codes == FORMAT_CODES.get(format_filter, UNKNOWN_CODE)
+
+        return mask
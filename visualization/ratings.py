@@ -0,0 +1,214 @@
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from .game_table import GameTable, MISSING_TIMESTAMP, _SECONDS_PER_DAY
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 32.0
+# Games between two stored rating states
+CHECKPOINT_INTERVAL = 500
+
+RATING_COLUMNS = ["Player", "Rating", "Peak", "Games"]
+HISTORY_COLUMNS = ["Played At", "Player", "Rating"]
+
+# Columns that decide a game's effect on the ratings
+_KEY_COLUMNS = ("game_ids", "winner_ids", "loser_ids", "played_at")
+
+
+@dataclass
+class RatingState:
+    """Ratings of all players after the first `position` games of a stream"""
+    position: int = 0
+    ratings: Dict[int, float] = field(default_factory=dict)
+    peaks: Dict[int, float] = field(default_factory=dict)
+    games: Dict[int, int] = field(default_factory=dict)
+
+    def copy(self) -> 'RatingState':
+        return RatingState(self.position, dict(self.ratings), dict(self.peaks), dict(self.games))
+
+    def play(self, winner_id: int, loser_id: int) -> Tuple[float, float]:
+        """Apply one game and return the new ratings of winner and loser"""
+        winner = self.ratings.get(winner_id, INITIAL_RATING)
+        loser = self.ratings.get(loser_id, INITIAL_RATING)
+        expected = 1.0 / (1.0 + 10.0 ** ((loser - winner) / 400.0))
+        delta = K_FACTOR * (1.0 - expected)
+        winner, loser = winner + delta, loser - delta
+
+        self.ratings[winner_id] = winner
+        self.ratings[loser_id] = loser
+        self.peaks[winner_id] = max(self.peaks.get(winner_id, INITIAL_RATING), winner)
+        self.peaks.setdefault(loser_id, INITIAL_RATING)
+        self.games[winner_id] = self.games.get(winner_id, 0) + 1
+        self.games[loser_id] = self.games.get(loser_id, 0) + 1
+        self.position += 1
+        return winner, loser
+
+
+@dataclass(frozen=True)
+class RatingSnapshot:
+    """Copy of a stream's ratings and history, safe to read while the stream is updated
+
+    The history arrays are shared, not copied: updates replace them instead
+    of changing them in place.
+    """
+    state: RatingState
+    history: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+    def __len__(self) -> int:
+        return self.state.position
+
+
+class RatingStream:
+    """Elo ratings of one filtered game stream, updated incrementally
+
+    Games are processed in (played_at, id) order. The state is stored every
+    CHECKPOINT_INTERVAL games, so when the games change only the part after
+    the first changed game is replayed, starting from the checkpoint before it.
+    Appending new games replays nothing but the new games.
+    """
+    def __init__(self):
+        self._columns: Dict[str, np.ndarray] = {column: np.empty(0, dtype=np.int64) for column in _KEY_COLUMNS}
+        self._checkpoints: List[RatingState] = [RatingState()]
+        self._state = RatingState()
+        # Ratings of winner and loser after each processed game
+        self._winner_after = np.empty(0)
+        self._loser_after = np.empty(0)
+
+    def __len__(self) -> int:
+        return self._state.position
+
+    def _common_prefix(self, columns: Dict[str, np.ndarray]) -> int:
+        """Number of leading games that are unchanged since the last update"""
+        length = min(len(self), len(columns["game_ids"]))
+        changed = np.zeros(length, dtype=bool)
+        for column in _KEY_COLUMNS:
+            changed |= self._columns[column][:length] != columns[column][:length]
+        return int(np.argmax(changed)) if changed.any() else length
+
+    def update(self, columns: Dict[str, np.ndarray]) -> int:
+        """Bring the ratings up to date with the given games and return the number of replayed games"""
+        start = self._common_prefix(columns)
+        if start < len(self):
+            # Resume from the last checkpoint before the first changed game
+            self._checkpoints = [c for c in self._checkpoints if c.position <= start]
+            self._state = self._checkpoints[-1].copy()
+
+        first = self._state.position
+        winner_after: List[float] = []
+        loser_after: List[float] = []
+        for winner_id, loser_id in zip(
+            columns["winner_ids"][first:].tolist(),
+            columns["loser_ids"][first:].tolist()
+        ):
+            winner, loser = self._state.play(winner_id, loser_id)
+            winner_after.append(winner)
+            loser_after.append(loser)
+            if self._state.position % CHECKPOINT_INTERVAL == 0:
+                self._checkpoints.append(self._state.copy())
+
+        self._winner_after = np.concatenate([self._winner_after[:first], winner_after])
+        self._loser_after = np.concatenate([self._loser_after[:first], loser_after])
+        self._columns = columns
+        return len(self) - first
+
+    @property
+    def state(self) -> RatingState:
+        return self._state
+
+    def history(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Played-at timestamps, winner and loser ids and their ratings after each game"""
+        return (
+            self._columns["played_at"],
+            self._columns["winner_ids"],
+            self._columns["loser_ids"],
+            self._winner_after,
+            self._loser_after,
+        )
+
+    def snapshot(self) -> RatingSnapshot:
+        return RatingSnapshot(self._state.copy(), self.history())
+
+
+class RatingEngine:
+    """Process-wide rating streams, one per edition and format filter
+
+    Each stream remembers the game table it was last updated with, so reruns
+    on the same data version cost a lookup. Tables are referenced weakly and
+    can be freed, along with everything built on them, once evicted from the
+    data caches.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._streams: Dict[Tuple[str, str], RatingStream] = {}
+        self._tables: Dict[Tuple[str, str], 'weakref.ref[GameTable]'] = {}
+
+    def snapshot(self, table: GameTable, edition_filter: str = "All", format_filter: str = "All") -> RatingSnapshot:
+        """Ratings of the filtered games, updated to the given table
+
+        Streams are shared by all sessions, so callers get a snapshot taken
+        under the lock instead of the live stream.
+        """
+        key = (edition_filter, format_filter)
+        with self._lock:
+            stream = self._streams.setdefault(key, RatingStream())
+            last_table = self._tables.get(key)
+            if last_table is None or last_table() is not table:
+                mask = table.filter_mask(edition_filter, format_filter)
+                stream.update({column: getattr(table, column)[mask] for column in _KEY_COLUMNS})
+                self._tables[key] = weakref.ref(table)
+            return stream.snapshot()
+
+    def reset(self) -> None:
+        """Drop all streams so the next access recomputes from scratch"""
+        with self._lock:
+            self._streams.clear()
+            self._tables.clear()
+
+
+def ratings_frame(state: RatingState, player_name) -> pd.DataFrame:
+    """Current ratings sorted from strongest to weakest"""
+    rows = [
+        {
+            "Player": player_name(player_id),
+            "Rating": round(rating, 1),
+            "Peak": round(state.peaks[player_id], 1),
+            "Games": state.games[player_id],
+        }
+        for player_id, rating in state.ratings.items()
+    ]
+    df = pd.DataFrame(rows, columns=RATING_COLUMNS)
+    return df.sort_values("Rating", ascending=False, ignore_index=True) if not df.empty else df
+
+
+def history_frame(snapshot: RatingSnapshot, player_name) -> pd.DataFrame:
+    """Rating of each player at the end of every day they played, in long format"""
+    played_at, winner_ids, loser_ids, winner_after, loser_after = snapshot.history
+    # Undated games count towards the ratings but have no place on a time axis
+    dated = played_at != MISSING_TIMESTAMP
+    times = np.concatenate([played_at[dated]] * 2)
+    ids = np.concatenate([winner_ids[dated], loser_ids[dated]])
+    ratings = np.concatenate([winner_after[dated], loser_after[dated]])
+
+    # Keep the last game of each player per day, one point per day is enough for a chart.
+    # Games are in stream order, so sorting by player and game position keeps time order.
+    positions = np.concatenate([np.arange(int(dated.sum()))] * 2)
+    order = np.lexsort((positions, ids))
+    days = times[order] // _SECONDS_PER_DAY
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = (ids[order][1:] != ids[order][:-1]) | (days[1:] != days[:-1])
+    keep = order[last]
+
+    names = {player_id: player_name(player_id) for player_id in np.unique(ids).tolist()}
+    df = pd.DataFrame({
+        "Played At": pd.to_datetime(times[keep], unit="s"),
+        "Player": [names[player_id] for player_id in ids[keep].tolist()],
+        "Rating": ratings[keep].round(1),
+    }, columns=HISTORY_COLUMNS)
+    return df.sort_values("Played At", kind="stable", ignore_index=True)
+
+
+# Create the shared instance
+rating_engine = RatingEngine()
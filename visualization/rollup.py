@@ -0,0 +1,107 @@
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+from config.config import config
+from .game_table import GameTable, EDITION_CODES, FORMAT_CODES, MISSING_TIMESTAMP, UNKNOWN_CODE, _SECONDS_PER_DAY, _day_number
+
+TREND_COLUMNS = ["Day", "Games", "Wins", "Losses", "Win Rate (%)", "Rolling Win Rate (%)"]
+
+# Rolling window of the trend charts in days
+DEFAULT_WINDOW_DAYS = 30
+
+# Edition codes start at NO_EDITION/UNKNOWN_CODE, shift them to be non-negative for key packing
+_CODE_OFFSET = -UNKNOWN_CODE
+
+
+class DailyRollup:
+    """Win and loss counts per (day, player, edition, format)
+
+    Built in one vectorized pass over a game table and sorted by day, so a
+    trend chart only touches one row per day the player played instead of
+    every game. Games without a timestamp have no day and are left out.
+    """
+    _built: 'weakref.WeakKeyDictionary[GameTable, DailyRollup]' = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
+    def __init__(self, table: GameTable):
+        dated = table.played_at != MISSING_TIMESTAMP
+        days = np.concatenate([table.played_at[dated] // _SECONDS_PER_DAY] * 2)
+        players = np.concatenate([table.winner_idx[dated], table.loser_idx[dated]])
+        editions = np.concatenate([table.edition_codes[dated]] * 2).astype(np.int64) + _CODE_OFFSET
+        formats = np.concatenate([table.format_codes[dated]] * 2).astype(np.int64) + _CODE_OFFSET
+        won = np.repeat([1, 0], int(dated.sum()))
+
+        # Pack the key into one integer with the day as the most significant part
+        player_count = max(table.player_count, 1)
+        edition_span = len(EDITION_CODES) + _CODE_OFFSET
+        format_span = len(FORMAT_CODES) + _CODE_OFFSET
+        first_day = int(days.min()) if len(days) else 0
+        keys = (((days - first_day) * player_count + players) * edition_span + editions) * format_span + formats
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+
+        self.wins = np.bincount(inverse, weights=won, minlength=len(unique_keys)).astype(np.int64)
+        self.losses = np.bincount(inverse, minlength=len(unique_keys)) - self.wins
+        self.format_codes = unique_keys % format_span - _CODE_OFFSET
+        unique_keys //= format_span
+        self.edition_codes = unique_keys % edition_span - _CODE_OFFSET
+        unique_keys //= edition_span
+        self.player_ids = table.player_ids[unique_keys % player_count]
+        self.days = unique_keys // player_count + first_day
+
+    @classmethod
+    def of(cls, table: GameTable) -> 'DailyRollup':
+        """Rollup of a game table, built on first use and kept as long as the table"""
+        with cls._lock:
+            rollup = cls._built.get(table)
+            if rollup is None:
+                config.metrics.cache_miss()
+                rollup = cls._built[table] = cls(table)
+            return rollup
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def player_trend(self, player_id: int, start_date=None, end_date=None, edition_filter="All", format_filter="All", window_days: int = DEFAULT_WINDOW_DAYS) -> pd.DataFrame:
+        """Daily games and cumulative and rolling win rates of a player"""
+        lo, hi = 0, len(self)
+        if start_date:
+            lo = int(np.searchsorted(self.days, _day_number(start_date), side="left"))
+        if end_date:
+            hi = int(np.searchsorted(self.days, _day_number(end_date), side="right"))
+
+        mask = self.player_ids[lo:hi] == player_id
+        if edition_filter != "All":
+            mask &= self.edition_codes[lo:hi] == EDITION_CODES.get(edition_filter, UNKNOWN_CODE)
+        if format_filter != "All":
+            mask &= self.format_codes[lo:hi] == FORMAT_CODES.get(format_filter, UNKNOWN_CODE)
+        if not mask.any():
+            return pd.DataFrame(columns=TREND_COLUMNS)
+
+        # Spread the player's rows over every calendar day of the range
+        days = self.days[lo:hi][mask]
+        offsets = days - days[0]
+        span = int(offsets[-1]) + 1
+        wins = np.bincount(offsets, weights=self.wins[lo:hi][mask], minlength=span)
+        games = wins + np.bincount(offsets, weights=self.losses[lo:hi][mask], minlength=span)
+
+        cumulative_wins = np.cumsum(wins)
+        cumulative_games = np.cumsum(games)
+        rolling_wins = _window_sums(cumulative_wins, window_days)
+        rolling_games = _window_sums(cumulative_games, window_days)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame({
+                "Day": pd.to_datetime(days[0] + np.arange(span), unit="D"),
+                "Games": games.astype(np.int64),
+                "Wins": wins.astype(np.int64),
+                "Losses": (games - wins).astype(np.int64),
+                "Win Rate (%)": (cumulative_wins / cumulative_games * 100).round(2),
+                "Rolling Win Rate (%)": np.where(rolling_games > 0, rolling_wins / rolling_games * 100, np.nan).round(2),
+            }, columns=TREND_COLUMNS)
+
+
+def _window_sums(cumulative: np.ndarray, window: int) -> np.ndarray:
+    """Sums over the last `window` entries, from a cumulative sum"""
+    shifted = np.concatenate([np.zeros(window), cumulative])[:len(cumulative)]
+    return cumulative - shifted
@@ -0,0 +1,212 @@
+"""Columnar snapshots of the games and players tables
+
+A snapshot is a directory holding games.arrow and players.arrow (Arrow IPC
+files) or games.parquet and players.parquet. Games are stored in
+(played_at, id) order with format and edition as dictionary columns and
+colors as bitmasks, so an Arrow snapshot can be memory-mapped straight into
+a GameTable without decoding any row.
+
+Usage: python -m visualization.snapshot DIRECTORY [--parquet]
+
+Requires the optional pyarrow package.
+"""
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import numpy as np
+from config.config import config
+from core.enums import GameFormat, Edition
+from data.repositories import GameRepository, PlayerRepository
+from .data_provider import DataProvider
+from .game_table import (
+    GameTable, FORMAT_CODES, EDITION_CODES, NO_EDITION, UNKNOWN_CODE, MISSING_TIMESTAMP, mask_colors
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Snapshots require pyarrow: pip install pyarrow")
+
+
+def _dictionary(codes: np.ndarray, values: List[str]) -> 'pa.DictionaryArray':
+    """Dictionary column whose indices are the enum codes, null for missing or unknown values"""
+    valid = (codes >= 0) & (codes < len(values))
+    indices = pa.array(np.where(valid, codes, 0).astype(np.int8), mask=~valid)
+    return pa.DictionaryArray.from_arrays(indices, pa.array(values, pa.string()))
+
+
+def _codes(column: 'pa.Array', codes: Dict[str, int], missing: int) -> np.ndarray:
+    """Map a dictionary column back to the enum codes of the running version"""
+    column = column.cast(pa.dictionary(pa.int8(), pa.string()))
+    # Remap through the stored dictionary in case the enums changed since the export
+    lookup = np.array([codes.get(value, UNKNOWN_CODE) for value in column.dictionary.to_pylist()] + [missing], dtype=np.int8)
+    indices = column.indices.fill_null(len(lookup) - 1).to_numpy()
+    return lookup[indices]
+
+
+def _games_table(table: GameTable) -> 'pa.Table':
+    # Wall-clock seconds map onto naive timestamps; games without one become null
+    missing = table.played_at == MISSING_TIMESTAMP
+    return pa.table({
+        "id": table.game_ids,
+        "winner_id": table.winner_ids,
+        "loser_id": table.loser_ids,
+        "format": _dictionary(table.format_codes, GameFormat.list()),
+        "edition": _dictionary(table.edition_codes, Edition.list()),
+        "played_at": pa.array(table.played_at, pa.timestamp("s"), mask=missing),
+        "winner_colors": table.winner_colors,
+        "loser_colors": table.loser_colors,
+    })
+
+
+def _players_table(players: List[Dict[str, Any]]) -> 'pa.Table':
+    return pa.table({
+        "id": pa.array([player["id"] for player in players], pa.int64()),
+        "name": pa.array([player["name"] for player in players], pa.string()),
+    })
+
+
+def _write(table: 'pa.Table', path: Path) -> None:
+    if path.suffix == ".parquet":
+        pq.write_table(table, path)
+        return
+    # A single record batch keeps every column one contiguous buffer
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(len(table), 1))
+
+
+def _read(path: Path) -> 'pa.Table':
+    if path.suffix == ".parquet":
+        return pq.read_table(path, memory_map=True)
+    # Columns stay backed by the mapped file; pages are loaded on first access
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+def _column(table: 'pa.Table', name: str) -> 'pa.Array':
+    column = table.column(name)
+    return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+
+def export_snapshot(directory: str, parquet: bool = False) -> Path:
+    """Write all games and players of the database to a snapshot directory"""
+    _require_pyarrow()
+    target = Path(directory)
+    target.mkdir(parents=True, exist_ok=True)
+    suffix = ".parquet" if parquet else ".arrow"
+
+    games = GameTable.from_pages(GameRepository.iter_pages())
+    _write(_games_table(games), target / f"games{suffix}")
+    _write(_players_table(PlayerRepository.get_all()), target / f"players{suffix}")
+    config.logger.info(f"Exported {len(games)} games to {target}")
+    return target
+
+
+class Snapshot:
+    """Games and players loaded from a snapshot directory"""
+    def __init__(self, directory: str):
+        _require_pyarrow()
+        source = Path(directory)
+        suffix = ".arrow" if (source / "games.arrow").exists() else ".parquet"
+        self.games = _read(source / f"games{suffix}")
+        self.players = _read(source / f"players{suffix}").to_pylist()
+
+    def game_table(self) -> GameTable:
+        """Games as a GameTable sharing the snapshot's buffers where possible"""
+        # Parquet stores second timestamps with a finer unit
+        played_at = _column(self.games, "played_at").cast(pa.timestamp("s"))
+        return GameTable.from_sorted_columns(
+            game_ids=_column(self.games, "id").to_numpy(),
+            winner_ids=_column(self.games, "winner_id").to_numpy(),
+            loser_ids=_column(self.games, "loser_id").to_numpy(),
+            format_codes=_codes(_column(self.games, "format"), FORMAT_CODES, UNKNOWN_CODE),
+            edition_codes=_codes(_column(self.games, "edition"), EDITION_CODES, NO_EDITION),
+            # Nulls become NaT, whose integer value is the missing timestamp sentinel
+            played_at=played_at.to_numpy(zero_copy_only=played_at.null_count == 0).view(np.int64),
+            winner_colors=_column(self.games, "winner_colors").to_numpy(),
+            loser_colors=_column(self.games, "loser_colors").to_numpy(),
+        )
+
+
+class SnapshotDataProvider(DataProvider):
+    """Data provider reading a snapshot instead of the database
+
+    Lets StatsCalculator and DataVisualizer run offline on an exported file.
+    """
+    def __init__(self, directory: str):
+        self.snapshot = Snapshot(directory)
+        self._table = self.snapshot.game_table()
+        self._names_by_id = {player["id"]: player["name"] for player in self.snapshot.players}
+        self._ids_by_name = {name: player_id for player_id, name in self._names_by_id.items()}
+
+    def get_game_table(self) -> GameTable:
+        return self._table
+
+    def _rows(self, indices: np.ndarray) -> List[Dict[str, Any]]:
+        """Games at the given table indices as rows shaped like the database rows"""
+        table = self._table
+        editions = Edition.list()
+        formats = GameFormat.list()
+        rows = []
+        for i in indices.tolist():
+            played_at = int(table.played_at[i])
+            rows.append({
+                "id": int(table.game_ids[i]),
+                "winner_id": int(table.winner_ids[i]),
+                "loser_id": int(table.loser_ids[i]),
+                "format": formats[table.format_codes[i]] if table.format_codes[i] >= 0 else None,
+                "edition": editions[table.edition_codes[i]] if table.edition_codes[i] >= 0 else None,
+                "winner_colors": mask_colors(int(table.winner_colors[i])),
+                "loser_colors": mask_colors(int(table.loser_colors[i])),
+                "played_at": (
+                    (_EPOCH + timedelta(seconds=played_at)).isoformat()
+                    if played_at != MISSING_TIMESTAMP else None
+                ),
+            })
+        return rows
+
+    def get_games(self) -> List[Dict[str, Any]]:
+        """Get all games as rows shaped like the database rows"""
+        return self._rows(np.arange(len(self._table)))
+
+    def get_recent_games(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get recent games with limit, ordered like the database by played_at then id, both descending"""
+        # The table is in (played_at, id) order with undated games first, while the
+        # database sorts them first when descending: reverse both parts separately
+        undated = int(np.count_nonzero(self._table.played_at == MISSING_TIMESTAMP))
+        order = np.concatenate([np.arange(undated)[::-1], np.arange(undated, len(self._table))[::-1]])
+        return self._rows(order[:limit] if limit is not None else order)
+
+    def get_players(self) -> List[Dict[str, Any]]:
+        return self.snapshot.players
+
+    def get_player_by_id(self, player_id: int) -> Optional[str]:
+        return self._names_by_id.get(player_id)
+
+    def get_player_id(self, name: str) -> Optional[int]:
+        return self._ids_by_name.get(name)
+
+    def get_aggregates(self) -> None:
+        # Every query is answered from the snapshot's game table
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export games and players to a columnar snapshot")
+    parser.add_argument("directory", help="directory the snapshot files are written to")
+    parser.add_argument("--parquet", action="store_true", help="write Parquet instead of Arrow IPC files")
+    args = parser.parse_args()
+    export_snapshot(args.directory, parquet=args.parquet)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,260 +1,280 @@
-from typing import Dict, List, Optional
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
 import pandas as pd
+from core.enums import COLOR_COMBINATIONS
+from data.aggregates import Record
 from .data_provider import DataProvider
-from datetime import datetime
+from .game_table import COLOR_BITS, mask_colors
+from .cube import AggregateCube
+from .rollup import DEFAULT_WINDOW_DAYS, TREND_COLUMNS
+from .ratings import rating_engine, ratings_frame, history_frame, RATING_COLUMNS, HISTORY_COLUMNS
+
+MATCHUP_COLUMNS = ["Opponent", "Wins", "Losses", "Total Games", "Win Rate (%)"]
+COLOR_COLUMNS = ["Colors", "Wins", "Losses", "Total Games", "Win Rate (%)"]
+INDIVIDUAL_COLOR_COLUMNS = ["Color", "Wins", "Losses", "Total Games", "Win Rate (%)"]
+OVERALL_COLUMNS = ["Player", "Wins", "Losses", "Total Games", "Win Rate (%)"]
+
+# Sorted color names and table label of every color mask, decoded once
+COMBINATION_COLORS = [sorted(mask_colors(mask)) for mask in range(COLOR_COMBINATIONS)]
+COMBINATION_LABELS = [", ".join(colors) or "Colorless" for colors in COMBINATION_COLORS]
+
+
+@dataclass(frozen=True)
+class StatsFilter:
+    """Filters shared by all statistics of one dashboard section"""
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    edition_filter: str = "All"
+    format_filter: str = "All"
+
+
+@dataclass
+class PlayerStats:
+    """All statistics tables of one player for one filter"""
+    overall: pd.DataFrame
+    matchups: pd.DataFrame
+    colors: pd.DataFrame
+    individual_colors: pd.DataFrame
+
+
+def _win_rate_frame(label_column: str, labels: List[str], wins: np.ndarray, totals: np.ndarray) -> pd.DataFrame:
+    """Build a win rate table sorted by win rate"""
+    stats = []
+    for label, win_count, total in zip(labels, wins.tolist(), totals.tolist()):
+        win_rate = round((win_count / total) * 100, 2) if total > 0 else 0
+        stats.append({
+            label_column: label,
+            "Wins": win_count,
+            "Losses": total - win_count,
+            "Total Games": total,
+            "Win Rate (%)": win_rate,
+        })
+
+    df = pd.DataFrame(stats, columns=[label_column, "Wins", "Losses", "Total Games", "Win Rate (%)"])
+    return df.sort_values("Win Rate (%)", ascending=False) if not df.empty else df
+
+
+def _record_frame(label_column: str, records: Dict[Any, Record], label: Callable[[Any], str]) -> pd.DataFrame:
+    """Build a win rate table from precomputed (wins, losses) records"""
+    keys = list(records)
+    wins = np.array([records[key][0] for key in keys], dtype=np.int64)
+    totals = np.array([sum(records[key]) for key in keys], dtype=np.int64)
+    return _win_rate_frame(label_column, [label(key) for key in keys], wins, totals)
+
+
+def _empty_player_stats() -> 'PlayerStats':
+    return PlayerStats(
+        overall=pd.DataFrame(columns=OVERALL_COLUMNS),
+        matchups=pd.DataFrame(columns=MATCHUP_COLUMNS),
+        colors=pd.DataFrame(columns=COLOR_COLUMNS),
+        individual_colors=pd.DataFrame(columns=INDIVIDUAL_COLOR_COLUMNS),
+    )
+
 
 class StatsCalculator:
     """Calculates statistics from game data"""
     def __init__(self, data_provider: DataProvider):
         self.data_provider = data_provider
-        self.players = self.data_provider.get_players()
+
+    def _use_aggregates(self, filters: StatsFilter) -> bool:
+        """Undated queries are answered from the incrementally maintained counters"""
+        return self.data_provider.get_aggregates() is not None and not (filters.start_date or filters.end_date)
+
+    def _aggregated_player_stats(self, player_name: str, filters: StatsFilter) -> Optional[PlayerStats]:
+        """Player statistics read from the counters, or None if they are unavailable"""
+        player_id = self.data_provider.get_player_id(player_name)
+        if player_id is None:
+            return _empty_player_stats()
+
+        aggregates = self.data_provider.get_aggregates()
+        matchups = aggregates.matchup_records(player_id, filters.edition_filter, filters.format_filter)
+        colors = aggregates.color_records(player_id, filters.edition_filter, filters.format_filter)
+        if matchups is None or colors is None:
+            return None
+        if not matchups:
+            return _empty_player_stats()
+
+        # Individual colors are derived from the color combinations
+        individual: Dict[str, List[int]] = {}
+        for mask, (wins, losses) in colors.items():
+            for color in COMBINATION_COLORS[mask] or ("Colorless",):
+                record = individual.setdefault(color, [0, 0])
+                record[0] += wins
+                record[1] += losses
+
+        overall = (sum(w for w, _ in matchups.values()), sum(l for _, l in matchups.values()))
+        return PlayerStats(
+            overall=_record_frame("Player", {player_name: overall}, str),
+            matchups=_record_frame("Opponent", matchups, self.data_provider.get_player_by_id),
+            colors=_record_frame("Colors", colors, COMBINATION_LABELS.__getitem__),
+            individual_colors=_record_frame("Color", {c: tuple(r) for c, r in individual.items()}, str),
+        )
+
+    def _player_cube(self, player_name: str):
+        """Look up a player in the aggregate cube
+
+        Returns the cube and the player's dense index, or None if the player
+        is unknown or has not played yet.
+        """
+        player_id = self.data_provider.get_player_id(player_name)
+        if player_id is None:
+            return None
+        cube = self.data_provider.get_aggregate_cube()
+        idx = cube.player_index(player_id)
+        if idx is None:
+            return None
+        return cube, idx
+
+    @staticmethod
+    def _overall_frame(player_name: str, wins: np.ndarray, totals: np.ndarray) -> pd.DataFrame:
+        total = int(totals.sum())
+        if not total:
+            return pd.DataFrame(columns=OVERALL_COLUMNS)
+        return _win_rate_frame("Player", [player_name], np.array([int(wins.sum())]), np.array([total]))
+
+    def _matchup_frame(self, cube: AggregateCube, player_idx: int, filters: StatsFilter) -> pd.DataFrame:
+        wins, totals = cube.matchups(player_idx, **asdict(filters))
+        played = np.flatnonzero(totals)
+
+        names = [self.data_provider.get_player_by_id(int(player_id)) for player_id in cube.player_ids[played]]
+        return _win_rate_frame("Opponent", names, wins[played], totals[played])
+
+    @staticmethod
+    def _color_frame(wins: np.ndarray, totals: np.ndarray) -> pd.DataFrame:
+        # Player's colors for each game, counted per color combination
+        played = np.flatnonzero(totals)
+        labels = [COMBINATION_LABELS[mask] for mask in played]
+        return _win_rate_frame("Colors", labels, wins[played], totals[played])
+
+    @staticmethod
+    def _individual_color_frame(wins: np.ndarray, totals: np.ndarray) -> pd.DataFrame:
+        # Count each color individually, plus "Colorless" for games without colors
+        masks = np.arange(COLOR_COMBINATIONS, dtype=np.uint8)
+        bits = np.array(list(COLOR_BITS.values()), dtype=np.uint8)
+        has_color = np.column_stack([(masks[:, None] & bits) != 0, masks == 0])
+        color_totals = totals @ has_color
+        color_wins = wins @ has_color
+        played = np.flatnonzero(color_totals)
+
+        labels = list(COLOR_BITS) + ["Colorless"]
+        return _win_rate_frame("Color", [labels[i] for i in played], color_wins[played], color_totals[played])
+
+    def calculate_player_stats(self, player_name: str, filters: Optional[StatsFilter] = None) -> PlayerStats:
+        """Calculate all statistics of a player from the aggregate cube"""
+        filters = filters or StatsFilter()
+        if self._use_aggregates(filters):
+            stats = self._aggregated_player_stats(player_name, filters)
+            if stats is not None:
+                return stats
+
+        selection = self._player_cube(player_name)
+        if selection is None:
+            return _empty_player_stats()
+        cube, idx = selection
+
+        # The color tables and the overall record are derived from the same color counts
+        color_wins, color_totals = cube.color_combinations(idx, **asdict(filters))
+        return PlayerStats(
+            overall=self._overall_frame(player_name, color_wins, color_totals),
+            matchups=self._matchup_frame(cube, idx, filters),
+            colors=self._color_frame(color_wins, color_totals),
+            individual_colors=self._individual_color_frame(color_wins, color_totals),
+        )
 
     def calculate_player_win_rates(self, start_date=None, end_date=None, edition_filter="All", format_filter="All") -> pd.DataFrame:
         """Calculate win rates for all players using all games in database"""
-        games = self.data_provider.get_games()  # Get ALL games
-
-        # Apply date filter if specified
-        if start_date:
-            games = [g for g in games if datetime.fromisoformat(g["played_at"]).date() >= start_date]
-        if end_date:
-            games = [g for g in games if datetime.fromisoformat(g["played_at"]).date() <= end_date]
-
-        # Apply edition filter if specified
-        if edition_filter != "All":
-            games = [g for g in games if g["edition"] == edition_filter]
-
-        # Apply format filter if specified
-        if format_filter != "All":
-            games = [g for g in games if g["format"] == format_filter]
-
-        win_counts: Dict[int, int] = {}
-        loss_counts: Dict[int, int] = {}
-
-        for game in games:
-            winner_id = game["winner_id"]
-            loser_id = game["loser_id"]
-            win_counts[winner_id] = win_counts.get(winner_id, 0) + 1
-            loss_counts[loser_id] = loss_counts.get(loser_id, 0) + 1
-
-        stats = []
-        for player_id in set(win_counts) | set(loss_counts):
-            name = self.data_provider.get_player_by_id(player_id)
-            wins = win_counts.get(player_id, 0)
-            losses = loss_counts.get(player_id, 0)
-            total = wins + losses
-            win_rate = round((wins / total) * 100, 2) if total > 0 else 0
-            stats.append({
-                "Player": name,
-                "Wins": wins,
-                "Losses": losses,
-                "Total Games": total,
-                "Win Rate (%)": win_rate,
-            })
-
-        if not stats:
+        filters = StatsFilter(start_date, end_date, edition_filter, format_filter)
+        if self._use_aggregates(filters):
+            records = self.data_provider.get_aggregates().player_records(edition_filter, format_filter)
+            if records is not None:
+                if not records:
+                    return pd.DataFrame()
+                return _record_frame("Player", records, self.data_provider.get_player_by_id)
+
+        cube = self.data_provider.get_aggregate_cube()
+        win_counts, totals = cube.player_records(**asdict(filters))
+        played = np.flatnonzero(totals)
+
+        if not len(played):
+            return pd.DataFrame()
+
+        names = [self.data_provider.get_player_by_id(int(player_id)) for player_id in cube.player_ids[played]]
+        return _win_rate_frame("Player", names, win_counts[played], totals[played])
+
+    def calculate_head_to_head(self, start_date=None, end_date=None, edition_filter="All", format_filter="All") -> pd.DataFrame:
+        """Calculate wins of every player (rows) against every opponent (columns)"""
+        cube = self.data_provider.get_aggregate_cube()
+        wins = cube.head_to_head(start_date, end_date, edition_filter, format_filter)
+        played = np.flatnonzero(wins.sum(axis=0) + wins.sum(axis=1))
+
+        if not len(played):
             return pd.DataFrame()
-        return pd.DataFrame(stats).sort_values(by="Win Rate (%)", ascending=False)
 
+        names = [self.data_provider.get_player_by_id(int(player_id)) for player_id in cube.player_ids[played]]
+        # Alphabetical order keeps the axes stable across filters
+        order = np.argsort(names, kind="stable")
+        played = played[order]
+        names = [names[i] for i in order]
+        return pd.DataFrame(wins[np.ix_(played, played)], index=names, columns=names)
 
     def calculate_player_matchups(self, player_name: str, start_date=None, end_date=None, edition_filter="All", format_filter="All"):
         """Calculate win rates against other players"""
-        # Get all games for the player
-        all_games = self.data_provider.get_games()  # Get ALL games instead of just recent ones
-        player_games = [
-            game for game in all_games
-            if player_name in [
-                self.data_provider.get_player_by_id(game["winner_id"]),
-                self.data_provider.get_player_by_id(game["loser_id"])
-            ]
-        ]
-
-        if not player_games:
-            return pd.DataFrame(columns=["Opponent", "Wins", "Losses", "Total Games", "Win Rate (%)"])
-
-        # Apply date filter if specified
-        if start_date:
-            player_games = [g for g in player_games if datetime.fromisoformat(g["played_at"]).date() >= start_date]
-        if end_date:
-            player_games = [g for g in player_games if datetime.fromisoformat(g["played_at"]).date() <= end_date]
-
-        # Apply edition filter if specified
-        if edition_filter != "All":
-            player_games = [g for g in player_games if g["edition"] == edition_filter]
-
-        # Apply format filter if specified
-        if format_filter != "All":
-            player_games = [g for g in player_games if g["format"] == format_filter]
-
-        # Calculate matchup statistics
-        matchups = {}
-        for game in player_games:
-            winner = self.data_provider.get_player_by_id(game["winner_id"])
-            loser = self.data_provider.get_player_by_id(game["loser_id"])
-            opponent = loser if winner == player_name else winner
-
-            if opponent not in matchups:
-                matchups[opponent] = {"wins": 0, "total": 0}
-            matchups[opponent]["total"] += 1
-            if winner == player_name:
-                matchups[opponent]["wins"] += 1
-
-        # Convert to DataFrame
-        if not matchups:
-            return pd.DataFrame(columns=["Opponent", "Wins", "Losses", "Total Games", "Win Rate (%)"])
-
-        stats = []
-        for opp, data in matchups.items():
-            total = data["total"]
-            wins = data["wins"]
-            losses = total - wins
-            win_rate = round((wins / total) * 100, 2) if total > 0 else 0
-            stats.append({
-                "Opponent": opp,
-                "Wins": wins,
-                "Losses": losses,
-                "Total Games": total,
-                "Win Rate (%)": win_rate,
-            })
-
-        df = pd.DataFrame(stats)
-        return df.sort_values("Win Rate (%)", ascending=False) if not df.empty else df
+        filters = StatsFilter(start_date, end_date, edition_filter, format_filter)
+        if self._use_aggregates(filters):
+            return self.calculate_player_stats(player_name, filters).matchups
+        selection = self._player_cube(player_name)
+        if selection is None:
+            return pd.DataFrame(columns=MATCHUP_COLUMNS)
+        return self._matchup_frame(*selection, filters)
 
     def calculate_player_color_stats(self, player_name: str, start_date=None, end_date=None, edition_filter="All", format_filter="All"):
         """Calculate win rates by color combination with filters"""
-        games = self.data_provider.get_games()  # Get ALL games
-        players = self.data_provider.get_players()
-
-        if not games or not players:
-            return pd.DataFrame(columns=["Colors", "Wins", "Losses", "Total Games", "Win Rate (%)"])
-
-        # Get player ID
-        player = next((p for p in players if p["name"] == player_name), None)
-        if not player:
-            return pd.DataFrame(columns=["Colors", "Wins", "Losses", "Total Games", "Win Rate (%)"])
-
-        # Filter games and collect color statistics
-        color_stats = {}
-        for game in games:
-            # Check if game involves the player
-            is_winner = game["winner_id"] == player["id"]
-            is_loser = game["loser_id"] == player["id"]
-            if not (is_winner or is_loser):
-                continue
-
-            # Apply date filter if specified
-            if start_date or end_date:
-                game_date = datetime.fromisoformat(game["played_at"]).date()
-                if start_date and game_date < start_date:
-                    continue
-                if end_date and game_date > end_date:
-                    continue
-
-            # Apply edition filter if specified
-            if edition_filter != "All" and game.get("edition") != edition_filter:
-                continue
-
-            # Apply format filter if specified
-            if format_filter != "All" and game.get("format") != format_filter:
-                continue
-
-            # Get player's colors for this game
-            colors = game["winner_colors"] if is_winner else game["loser_colors"]
-            color_key = ", ".join(sorted(colors)) if colors else "Colorless"
-
-            if color_key not in color_stats:
-                color_stats[color_key] = {"wins": 0, "total": 0}
-
-            color_stats[color_key]["total"] += 1
-            if is_winner:
-                color_stats[color_key]["wins"] += 1
-
-        # Convert to DataFrame
-        stats = []
-        for colors, data in color_stats.items():
-            total = data["total"]
-            wins = data["wins"]
-            win_rate = round((wins / total) * 100, 2) if total > 0 else 0
-            stats.append({
-                "Colors": colors,
-                "Wins": wins,
-                "Losses": total - wins,
-                "Total Games": total,
-                "Win Rate (%)": win_rate,
-            })
-
-        df = pd.DataFrame(stats)
-        return df.sort_values("Win Rate (%)", ascending=False) if not df.empty else df
+        filters = StatsFilter(start_date, end_date, edition_filter, format_filter)
+        if self._use_aggregates(filters):
+            return self.calculate_player_stats(player_name, filters).colors
+        selection = self._player_cube(player_name)
+        if selection is None:
+            return pd.DataFrame(columns=COLOR_COLUMNS)
+        cube, idx = selection
+        return self._color_frame(*cube.color_combinations(idx, **asdict(filters)))
 
     def calculate_player_individual_color_stats(self, player_name: str, start_date=None, end_date=None, edition_filter="All", format_filter="All"):
         """Calculate win rates by individual colors (counting each color in multi-color decks)"""
-        games = self.data_provider.get_games()
-        players = self.data_provider.get_players()
-
-        if not games or not players:
-            return pd.DataFrame(columns=["Color", "Wins", "Losses", "Total Games", "Win Rate (%)"])
-
-        # Get player ID
-        player = next((p for p in players if p["name"] == player_name), None)
-        if not player:
-            return pd.DataFrame(columns=["Color", "Wins", "Losses", "Total Games", "Win Rate (%)"])
-
-        # Filter games and collect individual color statistics
-        color_stats = {}
-        for game in games:
-            # Check if game involves the player
-            is_winner = game["winner_id"] == player["id"]
-            is_loser = game["loser_id"] == player["id"]
-            if not (is_winner or is_loser):
-                continue
-
-            # Apply date filter if specified
-            if start_date or end_date:
-                game_date = datetime.fromisoformat(game["played_at"]).date()
-                if start_date and game_date < start_date:
-                    continue
-                if end_date and game_date > end_date:
-                    continue
-
-            # Apply edition filter if specified
-            if edition_filter != "All" and game.get("edition") != edition_filter:
-                continue
-
-            # Apply format filter if specified
-            if format_filter != "All" and game.get("format") != format_filter:
-                continue
-
-            # Get player's colors for this game
-            colors = game["winner_colors"] if is_winner else game["loser_colors"]
-
-            # Count each color individually
-            for color in colors:
-                if color not in color_stats:
-                    color_stats[color] = {"wins": 0, "total": 0}
-                color_stats[color]["total"] += 1
-                if is_winner:
-                    color_stats[color]["wins"] += 1
-
-            # Add "Colorless" only if no colors were present
-            if not colors:
-                if "Colorless" not in color_stats:
-                    color_stats["Colorless"] = {"wins": 0, "total": 0}
-                color_stats["Colorless"]["total"] += 1
-                if is_winner:
-                    color_stats["Colorless"]["wins"] += 1
-
-        # Convert to DataFrame
-        stats = []
-        for color, data in color_stats.items():
-            total = data["total"]
-            wins = data["wins"]
-            win_rate = round((wins / total) * 100, 2) if total > 0 else 0
-            stats.append({
-                "Color": color,
-                "Wins": wins,
-                "Losses": total - wins,
-                "Total Games": total,
-                "Win Rate (%)": win_rate,
-            })
-
-        df = pd.DataFrame(stats)
-        return df.sort_values("Win Rate (%)", ascending=False) if not df.empty else df
+        filters = StatsFilter(start_date, end_date, edition_filter, format_filter)
+        if self._use_aggregates(filters):
+            return self.calculate_player_stats(player_name, filters).individual_colors
+        selection = self._player_cube(player_name)
+        if selection is None:
+            return pd.DataFrame(columns=INDIVIDUAL_COLOR_COLUMNS)
+        cube, idx = selection
+        return self._individual_color_frame(*cube.color_combinations(idx, **asdict(filters)))
+
+    def calculate_player_trend(self, player_name: str, filters: Optional[StatsFilter] = None, window_days: int = DEFAULT_WINDOW_DAYS) -> pd.DataFrame:
+        """Calculate daily games and cumulative and rolling win rates of a player"""
+        filters = filters or StatsFilter()
+        player_id = self.data_provider.get_player_id(player_name)
+        if player_id is None:
+            return pd.DataFrame(columns=TREND_COLUMNS)
+        return self.data_provider.get_daily_rollup().player_trend(
+            player_id, filters.start_date, filters.end_date,
+            filters.edition_filter, filters.format_filter, window_days
+        )
+
+    def _rating_snapshot(self, edition_filter="All", format_filter="All"):
+        return rating_engine.snapshot(self.data_provider.get_game_table(), edition_filter, format_filter)
+
+    def calculate_player_ratings(self, edition_filter="All", format_filter="All") -> pd.DataFrame:
+        """Calculate Elo ratings of all players over the complete game history"""
+        snapshot = self._rating_snapshot(edition_filter, format_filter)
+        if not len(snapshot):
+            return pd.DataFrame(columns=RATING_COLUMNS)
+        return ratings_frame(snapshot.state, self.data_provider.get_player_by_id)
+
+    def calculate_rating_history(self, edition_filter="All", format_filter="All") -> pd.DataFrame:
+        """Rating of each player at the end of every day they played, for charting"""
+        snapshot = self._rating_snapshot(edition_filter, format_filter)
+        if not len(snapshot):
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        return history_frame(snapshot, self.data_provider.get_player_by_id)
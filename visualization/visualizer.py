@@ -1,5 +1,7 @@
 import streamlit as st
-from .stats_calculator import StatsCalculator
+from typing import Optional
+from .stats_calculator import StatsCalculator, StatsFilter, PlayerStats
+from .rollup import DEFAULT_WINDOW_DAYS
 
 class DataVisualizer:
     """Visualizes statistics using Streamlit"""
@@ -21,13 +23,44 @@ class DataVisualizer:
             use_container_width=True
         )
 
-    def plot_player_matchups(self, player_name: str, start_date=None, end_date=None, edition_filter="All", format_filter="All"):
+    def plot_head_to_head(self, start_date=None, end_date=None, edition_filter="All", format_filter="All") -> None:
+        """Display the head-to-head win rates of all player pairs as a heatmap"""
+        wins = self.stats_calculator.calculate_head_to_head(start_date=start_date, end_date=end_date, edition_filter=edition_filter, format_filter=format_filter)
+        if wins.empty:
+            st.info("No games recorded yet.")
+            return
+
+        # Losses against an opponent are that opponent's wins
+        losses = wins.T
+        totals = wins + losses
+        win_rates = (wins / totals.where(totals > 0) * 100).round(1)
+        records = wins.astype(str) + "-" + losses.astype(str)
+
+        import plotly.graph_objects as go
+        fig = go.Figure(go.Heatmap(
+            z=win_rates.values,
+            x=win_rates.columns,
+            y=win_rates.index,
+            zmin=0,
+            zmax=100,
+            colorscale="RdBu",
+            colorbar={"title": "Win Rate (%)"},
+            customdata=records.values,
+            hovertemplate="%{y} vs %{x}<br>Win Rate: %{z:.1f}%<br>Record: %{customdata}<extra></extra>"
+        ))
+        fig.update_layout(xaxis_title="Opponent", yaxis_title="Player", yaxis_autorange="reversed")
+        st.plotly_chart(fig, use_container_width=True)
+
+    def plot_player_matchups(self, player_name: str, start_date=None, end_date=None, edition_filter="All", format_filter="All", player_stats: Optional[PlayerStats] = None):
         """Display player matchup statistics"""
         st.subheader(f"Matchup Statistics - {player_name}")
 
-        df = self.stats_calculator.calculate_player_matchups(
-            player_name, start_date, end_date, edition_filter, format_filter
-        )
+        if player_stats is not None:
+            df = player_stats.matchups
+        else:
+            df = self.stats_calculator.calculate_player_matchups(
+                player_name, start_date, end_date, edition_filter, format_filter
+            )
 
         if df.empty:
             st.info(f"No games found for {player_name} with the current filters.")
@@ -42,18 +75,21 @@ class DataVisualizer:
             use_container_width=True
         )
 
-    def plot_player_win_rates_by_color(self, player_name: str, start_date=None, end_date=None, edition_filter="All", format_filter="All") -> None:
+    def plot_player_win_rates_by_color(self, player_name: str, start_date=None, end_date=None, edition_filter="All", format_filter="All", player_stats: Optional[PlayerStats] = None) -> None:
         """Display win rates by color combination for a selected player"""
         st.subheader(f"Win Rates by Color Combination - {player_name}")
         st.caption("Shows statistics for each unique combination of colors played")
 
-        color_stats = self.stats_calculator.calculate_player_color_stats(
-            player_name,
-            start_date=start_date,
-            end_date=end_date,
-            edition_filter=edition_filter,
-            format_filter=format_filter
-        )
+        if player_stats is not None:
+            color_stats = player_stats.colors
+        else:
+            color_stats = self.stats_calculator.calculate_player_color_stats(
+                player_name,
+                start_date=start_date,
+                end_date=end_date,
+                edition_filter=edition_filter,
+                format_filter=format_filter
+            )
 
         if color_stats.empty:
             st.info(f"No games found for {player_name} with the current filters.")
@@ -67,18 +103,21 @@ class DataVisualizer:
             use_container_width=True
         )
 
-    def plot_player_individual_color_stats(self, player_name: str, start_date=None, end_date=None, edition_filter="All", format_filter="All") -> None:
+    def plot_player_individual_color_stats(self, player_name: str, start_date=None, end_date=None, edition_filter="All", format_filter="All", player_stats: Optional[PlayerStats] = None) -> None:
         """Display win rates by individual colors for a selected player"""
         st.subheader(f"Win Rates by Individual Color - {player_name}")
         st.caption("Each color is counted separately when playing multi-color decks")
 
-        color_stats = self.stats_calculator.calculate_player_individual_color_stats(
-            player_name,
-            start_date=start_date,
-            end_date=end_date,
-            edition_filter=edition_filter,
-            format_filter=format_filter
-        )
+        if player_stats is not None:
+            color_stats = player_stats.individual_colors
+        else:
+            color_stats = self.stats_calculator.calculate_player_individual_color_stats(
+                player_name,
+                start_date=start_date,
+                end_date=end_date,
+                edition_filter=edition_filter,
+                format_filter=format_filter
+            )
 
         if color_stats.empty:
             st.info(f"No games found for {player_name} with the current filters.")
@@ -91,3 +130,49 @@ class DataVisualizer:
             }),
             use_container_width=True
         )
+
+    def plot_player_ratings(self, edition_filter="All", format_filter="All") -> None:
+        """Display Elo ratings and their history for all players"""
+        ratings = self.stats_calculator.calculate_player_ratings(edition_filter=edition_filter, format_filter=format_filter)
+        if ratings.empty:
+            st.info("No games recorded yet.")
+            return
+
+        st.dataframe(
+            ratings.style.format({
+                "Rating": "{:.0f}",
+                "Peak": "{:.0f}",
+                "Games": "{:}"
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+
+        history = self.stats_calculator.calculate_rating_history(edition_filter=edition_filter, format_filter=format_filter)
+        if history.empty:
+            return
+
+        # Plotly is only needed once a chart is drawn
+        import plotly.express as px
+        fig = px.line(history, x="Played At", y="Rating", color="Player", line_shape="hv")
+        st.plotly_chart(fig, use_container_width=True)
+
+    def plot_player_trend(self, player_name: str, filters: Optional[StatsFilter] = None, window_days: int = DEFAULT_WINDOW_DAYS) -> None:
+        """Display games per day and the win rate trend of a player"""
+        st.subheader(f"Win Rate Trend - {player_name}")
+        st.caption(f"Overall win rate so far and over the last {window_days} days")
+
+        trend = self.stats_calculator.calculate_player_trend(player_name, filters, window_days)
+        if trend.empty:
+            st.info(f"No games found for {player_name} with the current filters.")
+            return
+
+        from plotly.subplots import make_subplots
+        import plotly.graph_objects as go
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        fig.add_trace(go.Bar(x=trend["Day"], y=trend["Games"], name="Games", opacity=0.3), secondary_y=True)
+        fig.add_trace(go.Scatter(x=trend["Day"], y=trend["Win Rate (%)"], name="Win Rate (%)"))
+        fig.add_trace(go.Scatter(x=trend["Day"], y=trend["Rolling Win Rate (%)"], name=f"{window_days}-day Win Rate (%)", connectgaps=True))
+        fig.update_yaxes(title_text="Win Rate (%)", range=[0, 100], secondary_y=False)
+        fig.update_yaxes(title_text="Games", secondary_y=True, showgrid=False)
+        st.plotly_chart(fig, use_container_width=True)